@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible.errors import AnsibleActionFail
+from ansible.module_utils.six import string_types
+from ansible.plugins.action import ActionBase
+from ansible.utils.vars import merge_hash
+
+
+class ActionModule(ActionBase):
+
+    _VALID_ARGS = frozenset(('jids', 'quorum', 'timeout', 'delay', 'backoff', 'max_delay', 'cleanup'))
+
+    def _job_ids(self, jids):
+        ''' accepts job ids, registered async results, or a registered loop of them '''
+        if isinstance(jids, dict):
+            jids = jids.get('results', [jids])
+        if isinstance(jids, string_types):
+            jids = [jids]
+        ids = []
+        for jid in jids:
+            if isinstance(jid, dict):
+                if 'ansible_job_id' not in jid:
+                    # skipped loop items never started a job
+                    continue
+                jid = jid['ansible_job_id']
+            ids.append(str(jid))
+        return ids
+
+    def run(self, tmp=None, task_vars=None):
+        results = super(ActionModule, self).run(tmp, task_vars)
+        del tmp  # tmp no longer has any effect
+
+        module_args = self._task.args.copy()
+        if 'jids' not in module_args:
+            raise AnsibleActionFail('jids is required')
+        module_args['jids'] = self._job_ids(module_args['jids'])
+
+        # same lookup as async_status, the status files live wherever the shell plugin puts them
+        try:
+            module_args['_async_dir'] = self.get_shell_option('async_dir', default='~/.ansible_async')
+        except AttributeError:
+            module_args['_async_dir'] = '~/.ansible_async'
+
+        results = merge_hash(results, self._execute_module(module_name='async_status_batch', module_args=module_args,
+                                                           task_vars=task_vars))
+        return results
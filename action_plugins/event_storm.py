@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import time
+
+from ansible.errors import AnsibleActionFail
+from ansible.plugins.action import ActionBase
+from ansible.utils.display import Display
+
+display = Display()
+
+
+def line(i, line_size):
+    text = 'event_storm line %08d ' % i
+    return text + '.' * (line_size - len(text)) if line_size > len(text) else text[:line_size]
+
+
+class ActionModule(ActionBase):
+    ''' writes the lines from the controller while the task runs, one display call per burst '''
+
+    TRANSFERS_FILES = False
+    _VALID_ARGS = frozenset(('lines', 'line_size', 'rate', 'burst', 'payload_size'))
+
+    def run(self, tmp=None, task_vars=None):
+        result = super(ActionModule, self).run(tmp, task_vars)
+        del tmp  # tmp no longer has any effect
+
+        args = self._task.args
+        try:
+            lines = max(0, int(args.get('lines', 1000)))
+            line_size = int(args.get('line_size', 80))
+            rate = float(args.get('rate', 0))
+            burst = max(1, int(args.get('burst', 1)))
+            payload_size = max(0, int(args.get('payload_size', 0)))
+        except (TypeError, ValueError) as e:
+            raise AnsibleActionFail('event_storm options must be numbers: %s' % e)
+
+        max_lag = 0.0
+        start = time.time()
+        for first in range(0, lines, burst):
+            if rate:
+                due = start + first / rate
+                lag = time.time() - due
+                if lag < 0:
+                    time.sleep(-lag)
+                else:
+                    max_lag = max(max_lag, lag)
+            display.display('\n'.join(line(i, line_size) for i in range(first, min(first + burst, lines))))
+        elapsed = time.time() - start
+
+        result.update(changed=False,
+                      payload='x' * payload_size,
+                      lines_produced=lines,
+                      elapsed=elapsed,
+                      achieved_rate=lines / elapsed if elapsed else 0.0,
+                      target_rate=rate,
+                      max_lag=max_lag)
+        return result
@@ -72,6 +72,9 @@ DOCUMENTATION = """
 
 from ansible.plugins.become import BecomeBase
 
+# (exe, flags, prompting, user) -> text before and after the per call key in the command prefix
+PREFIXES = {}
+
 
 class BecomeModule(BecomeBase):
 
@@ -81,24 +84,29 @@ class BecomeModule(BecomeBase):
     fail = ('Sorry, try again.',)
     missing = ('Sorry, a password is required to run custom_plugin', 'custom_plugin: a password is required')
 
+    def _compile_prefix(self, becomecmd, flags, prompting, user):
+        if prompting:
+            if flags:  # this could be simplified, but kept as is for now for backwards string matching
+                flags = flags.replace('-n', '')
+            head = ' '.join([becomecmd, flags, '-p "[custom_plugin via ansible, key='])
+            tail = '] password:" %s ' % ('-u %s' % (user) if user else '')
+            return head, tail
+        return ' '.join([becomecmd, flags, '', '-u %s' % (user) if user else '', '']), None
+
     def build_become_command(self, cmd, shell):
         super(BecomeModule, self).build_become_command(cmd, shell)
 
         if not cmd:
             return cmd
 
-        becomecmd = self.get_option('become_exe') or self.name
-
-        flags = self.get_option('become_flags') or ''
-        prompt = ''
-        if self.get_option('become_pass'):
-            self.prompt = '[custom_plugin via ansible, key=%s] password:' % self._id
-            if flags:  # this could be simplified, but kept as is for now for backwards string matching
-                flags = flags.replace('-n', '')
-            prompt = '-p "%s"' % (self.prompt)
-
-        user = self.get_option('become_user') or ''
-        if user:
-            user = '-u %s' % (user)
+        key = (self.get_option('become_exe') or self.name, self.get_option('become_flags') or '',
+               bool(self.get_option('become_pass')), self.get_option('become_user') or '')
+        try:
+            head, tail = PREFIXES[key]
+        except KeyError:
+            head, tail = PREFIXES[key] = self._compile_prefix(*key)
 
-        return ' '.join([becomecmd, flags, prompt, user, self._build_success_command(cmd, shell)])
+        if tail is None:
+            return head + self._build_success_command(cmd, shell)
+        self.prompt = '[custom_plugin via ansible, key=%s] password:' % self._id
+        return head + self._id + tail + self._build_success_command(cmd, shell)
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    cache: sqlite
+    short_description: Facts in a local SQLite database
+    version_added: "2.9"
+    description:
+        - Keeps facts in one SQLite database in WAL mode, every host is a row with its facts stored as compressed JSON.
+        - Writes and deletes are buffered and committed as one transaction once I(batch_size) of them are pending,
+          the oldest pending one is older than I(batch_interval) seconds, or the run ends. Until then they are
+          served from memory, so a play never waits on the database for its own writes.
+        - Besides the usual cache methods, C(get_many), C(set_many) and C(sync) read, write and commit many hosts
+          at once, C(flush) empties the cache with one statement.
+    requirements:
+        - found in the cache_plugins directory of this repository, e.g. ANSIBLE_CACHE_PLUGINS=./cache_plugins
+    options:
+      _uri:
+        required: True
+        description:
+          - Path of the database file, C(facts.sqlite) is used inside it when it is an existing directory.
+        env:
+          - name: ANSIBLE_CACHE_PLUGIN_CONNECTION
+        ini:
+          - key: fact_caching_connection
+            section: defaults
+      _prefix:
+        description: User defined prefix to use when creating the keys
+        env:
+          - name: ANSIBLE_CACHE_PLUGIN_PREFIX
+        ini:
+          - key: fact_caching_prefix
+            section: defaults
+      _timeout:
+        default: 86400
+        description: Expiration timeout in seconds for the cache plugin data, 0 never expires
+        env:
+          - name: ANSIBLE_CACHE_PLUGIN_TIMEOUT
+        ini:
+          - key: fact_caching_timeout
+            section: defaults
+        type: integer
+      batch_size:
+        default: 1000
+        description: Number of pending writes that triggers a commit.
+        env:
+          - name: ANSIBLE_CACHE_SQLITE_BATCH_SIZE
+        ini:
+          - key: batch_size
+            section: cache_sqlite
+        type: integer
+      batch_interval:
+        default: 5
+        description: Age in seconds of the oldest pending write that triggers a commit on the next write.
+        env:
+          - name: ANSIBLE_CACHE_SQLITE_BATCH_INTERVAL
+        ini:
+          - key: batch_interval
+            section: cache_sqlite
+        type: float
+      compression_level:
+        default: 6
+        description: zlib level the facts are compressed with, 0 stores them uncompressed.
+        env:
+          - name: ANSIBLE_CACHE_SQLITE_COMPRESSION_LEVEL
+        ini:
+          - key: compression_level
+            section: cache_sqlite
+        type: integer
+'''
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from ansible.errors import AnsibleError
+from ansible.module_utils._text import to_bytes, to_text
+from ansible.parsing.ajson import AnsibleJSONDecoder, AnsibleJSONEncoder
+from ansible.plugins.cache import BaseCacheModule
+
+SCHEMA = 'CREATE TABLE IF NOT EXISTS facts (key TEXT PRIMARY KEY, updated REAL NOT NULL, data BLOB NOT NULL)'
+# SQLite refuses statements with more host parameters than this on older builds
+MAX_VARIABLES = 999
+
+
+class CacheModule(BaseCacheModule):
+    """
+    A caching module backed by a SQLite database in WAL mode.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(CacheModule, self).__init__(*args, **kwargs)
+        path = self.get_option('_uri')
+        if not path:
+            raise AnsibleError("error, 'sqlite' cache plugin requires the 'fact_caching_connection' config option "
+                               "to be set (to a database file or a writeable directory path)")
+        path = os.path.expanduser(path)
+        if os.path.isdir(path):
+            path = os.path.join(path, 'facts.sqlite')
+        self._path = path
+        self._prefix = self.get_option('_prefix') or ''
+        self._timeout = float(self.get_option('_timeout') or 0)
+        self._batch_size = max(1, int(self.get_option('batch_size')))
+        self._batch_interval = float(self.get_option('batch_interval'))
+        self._compression_level = int(self.get_option('compression_level'))
+
+        self._cache = {}
+        # key -> value to write, or None to delete
+        self._pending = {}
+        self._pending_since = None
+        self._lock = threading.RLock()
+        self._db = None
+        self._pid = None
+        atexit.register(self.sync)
+
+    def _connection(self):
+        # a forked worker must not share the controller's connection
+        if self._db is None or self._pid != os.getpid():
+            directory = os.path.dirname(self._path)
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+            self._db = sqlite3.connect(self._path, timeout=30, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.execute(SCHEMA)
+            self._pid = os.getpid()
+        return self._db
+
+    def _encode(self, value):
+        data = to_bytes(json.dumps(value, cls=AnsibleJSONEncoder, sort_keys=True, separators=(',', ':')))
+        if self._compression_level:
+            return b'z' + zlib.compress(data, self._compression_level)
+        return b'j' + data
+
+    def _decode(self, blob):
+        blob = bytes(blob)
+        data = zlib.decompress(blob[1:]) if blob[:1] == b'z' else blob[1:]
+        return json.loads(to_text(data), cls=AnsibleJSONDecoder)
+
+    def _expired_before(self):
+        return time.time() - self._timeout if self._timeout > 0 else None
+
+    def _select(self, keys):
+        ''' decoded rows for the given prefixed keys that have not expired '''
+        found = {}
+        expired_before = self._expired_before()
+        db = self._connection()
+        for start in range(0, len(keys), MAX_VARIABLES):
+            chunk = keys[start:start + MAX_VARIABLES]
+            query = 'SELECT key, updated, data FROM facts WHERE key IN (%s)' % ','.join('?' * len(chunk))
+            for key, updated, data in db.execute(query, chunk):
+                if expired_before is None or updated >= expired_before:
+                    found[key] = self._decode(data)
+        return found
+
+    def _queue(self, key, value):
+        self._pending[key] = value
+        if self._pending_since is None:
+            self._pending_since = time.time()
+        if len(self._pending) >= self._batch_size or time.time() - self._pending_since >= self._batch_interval:
+            self.sync()
+
+    def sync(self):
+        ''' commits the pending writes and deletes in one transaction '''
+        with self._lock:
+            if not self._pending:
+                return
+            now = time.time()
+            writes = [(self._prefix + key, now, self._encode(value))
+                      for key, value in self._pending.items() if value is not None]
+            deletes = [(self._prefix + key,) for key, value in self._pending.items() if value is None]
+            db = self._connection()
+            with db:
+                if writes:
+                    db.executemany('INSERT OR REPLACE INTO facts (key, updated, data) VALUES (?, ?, ?)', writes)
+                if deletes:
+                    db.executemany('DELETE FROM facts WHERE key = ?', deletes)
+            self._pending = {}
+            self._pending_since = None
+
+    def get(self, key):
+        with self._lock:
+            if key in self._pending:
+                if self._pending[key] is None:
+                    raise KeyError
+                return self._pending[key]
+            if key not in self._cache:
+                found = self._select([self._prefix + key])
+                if not found:
+                    raise KeyError
+                self._cache[key] = found[self._prefix + key]
+            return self._cache.get(key)
+
+    def get_many(self, keys):
+        ''' facts of every given host that has any, in one query '''
+        with self._lock:
+            result = {}
+            missing = []
+            for key in keys:
+                if key in self._pending:
+                    if self._pending[key] is not None:
+                        result[key] = self._pending[key]
+                elif key in self._cache:
+                    result[key] = self._cache[key]
+                else:
+                    missing.append(key)
+            if missing:
+                found = self._select([self._prefix + key for key in missing])
+                for key in missing:
+                    if self._prefix + key in found:
+                        self._cache[key] = result[key] = found[self._prefix + key]
+            return result
+
+    def set(self, key, value):
+        with self._lock:
+            self._cache[key] = value
+            self._queue(key, value)
+
+    def set_many(self, values):
+        with self._lock:
+            for key, value in values.items():
+                self._cache[key] = value
+                self._pending[key] = value
+            if self._pending_since is None:
+                self._pending_since = time.time()
+            self.sync()
+
+    def keys(self):
+        with self._lock:
+            self.sync()
+            expired_before = self._expired_before()
+            query = 'SELECT key FROM facts WHERE substr(key, 1, ?) = ?'
+            params = [len(self._prefix), self._prefix]
+            if expired_before is not None:
+                query += ' AND updated >= ?'
+                params.append(expired_before)
+            return [key[len(self._prefix):] for (key,) in self._connection().execute(query, params)]
+
+    def contains(self, key):
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key] is not None
+            if key in self._cache:
+                return True
+            query = 'SELECT updated FROM facts WHERE key = ?'
+            row = self._connection().execute(query, (self._prefix + key,)).fetchone()
+            expired_before = self._expired_before()
+            return row is not None and (expired_before is None or row[0] >= expired_before)
+
+    def delete(self, key):
+        with self._lock:
+            self._cache.pop(key, None)
+            self._queue(key, None)
+
+    def flush(self):
+        with self._lock:
+            self._cache = {}
+            self._pending = {}
+            self._pending_since = None
+            db = self._connection()
+            with db:
+                db.execute('DELETE FROM facts WHERE substr(key, 1, ?) = ?', (len(self._prefix), self._prefix))
+
+    def copy(self):
+        ''' facts of all hosts, read in one query '''
+        keys = self.keys()
+        return self.get_many(keys)
+
+    def __getstate__(self):
+        return dict()
+
+    def __setstate__(self, data):
+        self.__init__()
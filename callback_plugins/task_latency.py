@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    callback: task_latency
+    type: aggregate
+    short_description: Records per task and host latencies and writes percentiles as JSON
+    version_added: "2.9"
+    description:
+        - Records, for every task and host, the wall time from the worker starting to the result arriving,
+          the gap between the task being queued and the worker starting, and the module's own duration
+          when the result reports one (C(delta) of command modules, C(elapsed) of wait_for and friends).
+        - Samples go into preallocated arrays, so recording one costs a few index writes.
+        - At the end of every play, p50/p95/p99 and a log scale histogram are computed per task and per
+          strategy (C(linear), C(free) or C(serial) for plays using serial) and the JSON file is rewritten.
+        - Optionally profiles the controller with cProfile or tracemalloc for the whole run.
+    requirements:
+      - enable in configuration (callback_whitelist = task_latency)
+    options:
+      output_path:
+        description: JSON file the results are written to, the profile goes next to it.
+        default: task_latency.json
+        env:
+          - name: ANSIBLE_TASK_LATENCY_OUTPUT
+        ini:
+          - section: callback_task_latency
+            key: output_path
+      profile:
+        description: Controller side profiler to run, C(cprofile), C(tracemalloc) or C(none).
+        default: none
+        choices: ['none', 'cprofile', 'tracemalloc']
+        env:
+          - name: ANSIBLE_TASK_LATENCY_PROFILE
+        ini:
+          - section: callback_task_latency
+            key: profile
+      profile_top:
+        description: Number of hotspots included in the JSON output when profiling.
+        type: int
+        default: 25
+        env:
+          - name: ANSIBLE_TASK_LATENCY_PROFILE_TOP
+        ini:
+          - section: callback_task_latency
+            key: profile_top
+'''
+
+import json
+import math
+import re
+import time
+from array import array
+
+from ansible.module_utils.six import string_types
+from ansible.plugins.callback import CallbackBase
+
+# histogram bucket upper bounds in seconds, the last bucket takes everything above
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 60)
+DELTA_RE = re.compile(r'^(\d+):(\d+):(\d+(?:\.\d+)?)$')
+NAN = float('nan')
+
+
+def percentile(ordered, fraction):
+    ''' nearest-rank percentile of an already sorted list '''
+    return ordered[max(0, int(math.ceil(fraction * len(ordered))) - 1)]
+
+
+def summarize(values):
+    values = sorted(v for v in values if v == v)  # drops NaN
+    if not values:
+        return None
+    counts = [0] * (len(BUCKETS) + 1)
+    bucket = 0
+    for value in values:
+        while bucket < len(BUCKETS) and value > BUCKETS[bucket]:
+            bucket += 1
+        counts[bucket] += 1
+    return {'count': len(values),
+            'min': values[0],
+            'max': values[-1],
+            'mean': sum(values) / len(values),
+            'p50': percentile(values, 0.50),
+            'p95': percentile(values, 0.95),
+            'p99': percentile(values, 0.99),
+            'histogram': {'le': list(BUCKETS) + ['inf'], 'counts': counts}}
+
+
+def summarize_rows(samples, rows):
+    return {'wall': summarize(samples.finished[r] - samples.started[r] for r in rows),
+            'queue_gap': summarize(samples.started[r] - samples.queued[r] for r in rows),
+            'module': summarize(samples.module[r] for r in rows)}
+
+
+def module_duration(result):
+    ''' duration the module reported for itself, NaN when it does not report one '''
+    delta = result.get('delta')
+    if isinstance(delta, string_types):
+        match = DELTA_RE.match(delta)
+        if match:
+            return int(match.group(1)) * 3600 + int(match.group(2)) * 60 + float(match.group(3))
+    elapsed = result.get('elapsed')
+    if isinstance(elapsed, (int, float)) and not isinstance(elapsed, bool):
+        return float(elapsed)
+    return NAN
+
+
+class Samples(object):
+    ''' column arrays that double in size when full, rather than one object per sample '''
+
+    def __init__(self, capacity=4096):
+        self.count = 0
+        self.capacity = capacity
+        self.task = array('l', [0]) * capacity
+        self.host = array('l', [0]) * capacity
+        self.queued = array('d', [NAN]) * capacity
+        self.started = array('d', [NAN]) * capacity
+        self.finished = array('d', [NAN]) * capacity
+        self.module = array('d', [NAN]) * capacity
+
+    def allocate(self, task, host, queued, started):
+        if self.count == self.capacity:
+            for column in (self.task, self.host):
+                column.extend(array('l', [0]) * self.capacity)
+            for column in (self.queued, self.started, self.finished, self.module):
+                column.extend(array('d', [NAN]) * self.capacity)
+            self.capacity *= 2
+        row = self.count
+        self.count += 1
+        self.task[row] = task
+        self.host[row] = host
+        self.queued[row] = queued
+        self.started[row] = started
+        return row
+
+
+class CallbackModule(CallbackBase):
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'task_latency'
+    CALLBACK_NEEDS_WHITELIST = True
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self, display=None):
+        super(CallbackModule, self).__init__(display=display)
+        self._samples = Samples()
+        self._tasks = []          # (play index, name, action) per task index
+        self._task_index = {}     # task uuid -> task index
+        self._task_queued = {}    # task index -> time the task was queued
+        self._hosts = {}          # host name -> host index
+        self._pending = {}        # (task index, host index) -> sample row
+        self._plays = []          # finished play summaries
+        self._play = None
+        self._profiler = None
+        self._output_path = 'task_latency.json'
+        self._profile = 'none'
+        self._profile_top = 25
+
+    def set_options(self, task_keys=None, var_options=None, direct=None):
+        super(CallbackModule, self).set_options(task_keys=task_keys, var_options=var_options, direct=direct)
+        self._output_path = self.get_option('output_path')
+        self._profile = self.get_option('profile')
+        self._profile_top = self.get_option('profile_top')
+
+    def v2_playbook_on_start(self, playbook):
+        if self._profile == 'cprofile':
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif self._profile == 'tracemalloc':
+            import tracemalloc
+            tracemalloc.start(10)
+
+    def v2_playbook_on_play_start(self, play):
+        self._finish_play()
+        strategy = 'serial' if play.serial else (play.strategy or 'linear')
+        self._play = {'name': play.get_name(), 'strategy': strategy, 'start': time.time(),
+                      'first_task': len(self._tasks), 'first_sample': self._samples.count}
+
+    def _task_start(self, task):
+        index = self._task_index.get(task._uuid)
+        if index is None:
+            index = self._task_index[task._uuid] = len(self._tasks)
+            self._tasks.append((len(self._plays), task.get_name(), task.action))
+        # free strategy starts the same task again for later hosts, the latest start is what they queued behind
+        self._task_queued[index] = time.time()
+
+    def v2_playbook_on_task_start(self, task, is_conditional):
+        self._task_start(task)
+
+    def v2_playbook_on_handler_task_start(self, task):
+        self._task_start(task)
+
+    def _host_index(self, host):
+        name = host.get_name()
+        index = self._hosts.get(name)
+        if index is None:
+            index = self._hosts[name] = len(self._hosts)
+        return index
+
+    def v2_runner_on_start(self, host, task):
+        now = time.time()
+        task_index = self._task_index.get(task._uuid)
+        if task_index is None:
+            return
+        host_index = self._host_index(host)
+        self._pending[(task_index, host_index)] = self._samples.allocate(
+            task_index, host_index, self._task_queued.get(task_index, now), now)
+
+    def _runner_result(self, result):
+        now = time.time()
+        task_index = self._task_index.get(result._task._uuid)
+        if task_index is None:
+            return
+        host_index = self._host_index(result._host)
+        row = self._pending.pop((task_index, host_index), None)
+        if row is None:
+            # no v2_runner_on_start (e.g. results skipped before a worker was forked)
+            queued = self._task_queued.get(task_index, now)
+            row = self._samples.allocate(task_index, host_index, queued, queued)
+        self._samples.finished[row] = now
+        self._samples.module[row] = module_duration(result._result)
+
+    v2_runner_on_ok = _runner_result
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._runner_result(result)
+
+    v2_runner_on_skipped = _runner_result
+    v2_runner_on_unreachable = _runner_result
+
+    def _finish_play(self):
+        if self._play is None:
+            return
+        play, self._play = self._play, None
+        samples = self._samples
+        rows = range(play['first_sample'], samples.count)
+
+        by_task = {}
+        for r in rows:
+            by_task.setdefault(samples.task[r], []).append(r)
+        tasks = []
+        for task_index in range(play['first_task'], len(self._tasks)):
+            name, action = self._tasks[task_index][1:]
+            entry = {'name': name, 'action': action, 'hosts': len(by_task.get(task_index, []))}
+            entry.update(summarize_rows(samples, by_task.get(task_index, [])))
+            tasks.append(entry)
+
+        summary = {'name': play['name'], 'strategy': play['strategy'], 'duration': time.time() - play['start'],
+                   'tasks': tasks}
+        summary.update(summarize_rows(samples, rows))
+        self._plays.append(summary)
+        self._write()
+
+    def _strategies(self):
+        ''' merges the samples of all finished plays sharing a strategy '''
+        samples = self._samples
+        rows = {}
+        for r in range(samples.count):
+            play_index = self._tasks[samples.task[r]][0]
+            if play_index < len(self._plays):
+                rows.setdefault(self._plays[play_index]['strategy'], []).append(r)
+        return dict((strategy, summarize_rows(samples, selected)) for strategy, selected in rows.items())
+
+    def _write(self, profile=None):
+        output = {'hosts': len(self._hosts), 'samples': self._samples.count,
+                  'strategies': self._strategies(), 'plays': self._plays}
+        if profile is not None:
+            output['profile'] = profile
+        with open(self._output_path, 'w') as f:
+            json.dump(output, f, indent=2)
+
+    def _stop_profiler(self):
+        if self._profile == 'cprofile' and self._profiler is not None:
+            import pstats
+            self._profiler.disable()
+            path = self._output_path + '.prof'
+            self._profiler.dump_stats(path)
+            stats = pstats.Stats(path)
+            top = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:self._profile_top]
+            return {'type': 'cprofile', 'path': path,
+                    'top_cumulative': [{'function': '%s:%d(%s)' % key, 'calls': value[1], 'tottime': value[2],
+                                        'cumtime': value[3]} for key, value in top]}
+        if self._profile == 'tracemalloc':
+            import tracemalloc
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return {'type': 'tracemalloc', 'current': current, 'peak': peak,
+                    'top_allocations': [{'location': str(stat.traceback[0]), 'size': stat.size, 'count': stat.count}
+                                        for stat in snapshot.statistics('lineno')[:self._profile_top]]}
+        return None
+
+    def v2_playbook_on_stats(self, stats):
+        self._finish_play()
+        profile = self._stop_profiler()
+        self._write(profile)
+        self._display.display('task_latency: wrote %d samples to %s' % (self._samples.count, self._output_path))
@@ -1,43 +1,130 @@
 #!/usr/bin/env python
-from argparse import ArgumentParser
-from pprint import pprint
-
-inventory = {'group_one': {'hosts': ['group_one_host_0{}'.format(i) for i in range(1, 6)]
-                                    + ['group_one_and_two_host_0{}'.format(i) for i in range(1, 6)]
-                                    + ['group_one_two_and_three_host_0{}'.format(i) for i in range(1, 6)],
-                           'vars': {'is_in_group_one': True,
-                                    'complex_var': [{"dir": "/opt/gwaf/logs",
-                                                     "sourcetype": "gwaf",
-                                                     "something_else": [1, 2, 3]}]}},
-             'group_two': {'hosts': ['group_two_host_0{}'.format(i) for i in range(1, 6)]
-                                    + ['group_one_and_two_host_0{}'.format(i) for i in range(1, 6)]
-                                    + ['group_two_and_three_host_0{}'.format(i) for i in range(1, 6)]
-                                    + ['group_one_two_and_three_host_0{}'.format(i) for i in range(1, 6)],
-                           'vars': {'is_in_group_two': True}},
-             'group_three': {'hosts': ['group_three_host_0{}'.format(i) for i in range(1, 6)]
-                                    + ['group_two_and_three_host_0{}'.format(i) for i in range(1, 6)]
-                                    + ['group_one_two_and_three_host_0{}'.format(i) for i in range(1, 6)],
-                             'vars': {'is_in_group_three': True}},
-             'all': {'vars': {'ansible_connection': 'local',
-                              'inventories_var': True}},
-             'ungrouped': {'hosts': ['ungrouped_host_0{}'.format(i) for i in range(1, 6)]},
-             '_meta': {'hostvars': {'group_one_host_01': {'group_one_host_01_has_this_var': True},
-                                    'group_two_host_01': {'group_two_host_01_has_this_var': True},
-                                    'group_three_host_01': {'group_three_host_01_has_this_var': True}}}}
-
-def parse_args():
-    parser = ArgumentParser()
-    parser.add_argument('--list', dest='list_instances', action='store_true', default=True,
-                        help='List instances (default: True)')
-    parser.add_argument('--host', dest='requested_host', help='Get all the variables about a specific instance')
-    return parser.parse_args()
-
-
-def load_inventory():
-    args = parse_args()
-    if args.list_instances:
-        pprint(inventory)
+import json
+import os
+import random
+
+from dyn_inventory_lib import dumps, main
+
+# Without arguments this prints the static group_one/two/three layout below.
+# Passing --hosts (or setting DYN_INVENTORY_HOSTS) switches to a generated
+# inventory of that size, which is streamed as compact JSON so that very large
+# inventories can be produced without holding them in memory.
+
+encoder = json.JSONEncoder(separators=(',', ':'))
+
+
+def host_name(index, width):
+    return 'synthetic_host_{0:0{1}d}'.format(index, width)
+
+
+def group_name(index, width):
+    return 'synthetic_group_{0:0{1}d}'.format(index, width)
+
+
+def overlaps(index, seed, threshold):
+    # multiplicative hash so membership can be recomputed per group without storing it
+    return ((index + 1) * 2654435761 ^ seed) & 0xffffffff < threshold
+
+
+def group_members(group, host_count, group_count, seed, threshold):
+    # every host belongs to group (index % group_count); overlapping hosts also join the next group
+    for index in range(group, host_count, group_count):
+        yield index
+    if group_count > 1 and threshold:
+        for index in range((group - 1) % group_count, host_count, group_count):
+            if overlaps(index, seed, threshold):
+                yield index
+
+
+def write_generated(out, host_count, group_count, overlap, hostvar_size, seed):
+    group_count = max(1, min(group_count, host_count or 1))
+    host_width = len(str(max(host_count - 1, 0)))
+    group_width = len(str(group_count - 1))
+    threshold = int(max(0.0, min(overlap, 1.0)) * 0x100000000)
+
+    out.write('{"all":')
+    out.write(encoder.encode({'vars': {'ansible_connection': 'local', 'inventories_var': True}}))
+    for group in range(group_count):
+        out.write(',')
+        out.write(encoder.encode(group_name(group, group_width)))
+        out.write(':{"hosts":[')
+        separator = ''
+        for index in group_members(group, host_count, group_count, seed, threshold):
+            out.write(separator)
+            out.write('"{}"'.format(host_name(index, host_width)))
+            separator = ','
+        out.write('],"vars":')
+        out.write(encoder.encode({'synthetic_group_index': group}))
+        out.write('}')
+    out.write(',"ungrouped":{"hosts":[]},"_meta":{"hostvars":{')
+
+    rng = random.Random(seed)
+    for index in range(host_count):
+        hostvars = {'synthetic_host_index': index}
+        if hostvar_size > 0:
+            hostvars['payload'] = '{0:0{1}x}'.format(rng.getrandbits(hostvar_size * 4), hostvar_size)
+        if index:
+            out.write(',')
+        out.write('"{}":'.format(host_name(index, host_width)))
+        for chunk in encoder.iterencode(hostvars):
+            out.write(chunk)
+    out.write('}}}\n')
+
+
+def build_inventory(args):
+    if args.host_count:
+        # generated inventories are only ever streamed, see write_generated
+        return {}
+    return {'group_one': {'hosts': ['group_one_host_0{}'.format(i) for i in range(1, 6)]
+                                   + ['group_one_and_two_host_0{}'.format(i) for i in range(1, 6)]
+                                   + ['group_one_two_and_three_host_0{}'.format(i) for i in range(1, 6)],
+                          'vars': {'is_in_group_one': True,
+                                   'complex_var': [{"dir": "/opt/gwaf/logs",
+                                                    "sourcetype": "gwaf",
+                                                    "something_else": [1, 2, 3]}]}},
+            'group_two': {'hosts': ['group_two_host_0{}'.format(i) for i in range(1, 6)]
+                                   + ['group_one_and_two_host_0{}'.format(i) for i in range(1, 6)]
+                                   + ['group_two_and_three_host_0{}'.format(i) for i in range(1, 6)]
+                                   + ['group_one_two_and_three_host_0{}'.format(i) for i in range(1, 6)],
+                          'vars': {'is_in_group_two': True}},
+            'group_three': {'hosts': ['group_three_host_0{}'.format(i) for i in range(1, 6)]
+                                   + ['group_two_and_three_host_0{}'.format(i) for i in range(1, 6)]
+                                   + ['group_one_two_and_three_host_0{}'.format(i) for i in range(1, 6)],
+                            'vars': {'is_in_group_three': True}},
+            'all': {'vars': {'ansible_connection': 'local',
+                             'inventories_var': True}},
+            'ungrouped': {'hosts': ['ungrouped_host_0{}'.format(i) for i in range(1, 6)]},
+            '_meta': {'hostvars': {'group_one_host_01': {'group_one_host_01_has_this_var': True},
+                                   'group_two_host_01': {'group_two_host_01_has_this_var': True},
+                                   'group_three_host_01': {'group_three_host_01_has_this_var': True}}}}
+
+
+def stream_inventory(args, out):
+    if args.host_count:
+        write_generated(out, args.host_count, args.group_count, args.overlap, args.hostvar_size, args.seed)
+    else:
+        out.write(dumps(build_inventory(args)))
+        out.write('\n')
+
+
+def add_arguments(parser):
+    parser.add_argument('--hosts', dest='host_count', type=int,
+                        default=int(os.environ.get('DYN_INVENTORY_HOSTS', 0)),
+                        help='Generate this many hosts instead of the default layout (env: DYN_INVENTORY_HOSTS)')
+    parser.add_argument('--groups', dest='group_count', type=int,
+                        default=int(os.environ.get('DYN_INVENTORY_GROUPS', 10)),
+                        help='Number of generated groups (env: DYN_INVENTORY_GROUPS, default: 10)')
+    parser.add_argument('--overlap', dest='overlap', type=float,
+                        default=float(os.environ.get('DYN_INVENTORY_OVERLAP', 0.1)),
+                        help='Fraction of hosts that also join a second group '
+                             '(env: DYN_INVENTORY_OVERLAP, default: 0.1)')
+    parser.add_argument('--hostvar-size', dest='hostvar_size', type=int,
+                        default=int(os.environ.get('DYN_INVENTORY_HOSTVAR_SIZE', 0)),
+                        help='Size in characters of the payload hostvar (env: DYN_INVENTORY_HOSTVAR_SIZE)')
+    parser.add_argument('--seed', dest='seed', type=int,
+                        default=int(os.environ.get('DYN_INVENTORY_SEED', 0)),
+                        help='Seed for group overlap and hostvar payloads (env: DYN_INVENTORY_SEED)')
 
 
 if __name__ == '__main__':
-    load_inventory()
+    main(__file__, build_inventory, add_arguments=add_arguments, stream=stream_inventory)
@@ -0,0 +1,144 @@
+from argparse import ArgumentParser
+import hashlib
+import json
+import os
+import shutil
+import stat
+import sys
+import tempfile
+
+# Shared --list/--host handling for the dyn_inventory*.py scripts.
+#
+# Each script hands main() a function that builds its inventory.  The --list
+# output is serialized once and kept on disk, keyed by the script's mtime, the
+# environment variables it reads and its own arguments, so repeated syncs of
+# an unchanged source just copy the cached file to stdout.  The build function
+# is only called on a cache miss or for --host.
+#
+# The cache lives in DYN_INVENTORY_CACHE_DIR (default: dyn_inventory under
+# XDG_CACHE_HOME or ~/.cache), which has to be a directory only the current
+# user can write to, and is bypassed with --no-cache or DYN_INVENTORY_CACHE=0.
+# Scripts whose output must change on every run pass cache=False to main(),
+# DYN_INVENTORY_CACHE=1 still turns the cache on for them.  When the cache
+# cannot be used the inventory is written without it.
+
+
+def dumps(dct):
+    return json.dumps(dct, separators=(',', ':'))
+
+
+def cache_dir():
+    ''' the cache directory, created 0700, OSError unless it belongs to the current user and nobody else can write it '''
+    directory = os.environ.get('DYN_INVENTORY_CACHE_DIR') or os.path.join(
+        os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'dyn_inventory')
+    if not os.path.isdir(directory):
+        try:
+            os.makedirs(directory, 0o700)
+        except OSError:
+            if not os.path.isdir(directory):
+                raise
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o022:
+        raise OSError('{} is not a private directory of the current user'.format(directory))
+    return directory
+
+
+def cache_enabled(args, default=True):
+    if args.no_cache:
+        return False
+    setting = os.environ.get('DYN_INVENTORY_CACHE')
+    if setting is None:
+        return default
+    return setting.lower() not in ('0', 'false', 'no')
+
+
+def cache_path(script, env_vars, args):
+    script = os.path.realpath(script)
+    key = [script]
+    for path in (script, os.path.abspath(__file__)):
+        stat = os.stat(path)
+        key.append('{}:{}:{}'.format(path, stat.st_mtime, stat.st_size))
+    for name in env_vars:
+        key.append('{}={!r}'.format(name, os.environ.get(name)))
+    key.extend('{}={!r}'.format(name, value) for name, value in sorted(vars(args).items())
+               if name not in ('list_instances', 'requested_host', 'no_cache'))
+    prefix = hashlib.sha1(script.encode('utf-8')).hexdigest()[:16]
+    digest = hashlib.sha1('\0'.join(key).encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir(), '{}-{}.json'.format(prefix, digest))
+
+
+def write_cached(path, write):
+    ''' writes the output to a temp file next to the cache entry, then moves it into place and drops stale entries '''
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as out:
+            write(out)
+        os.rename(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    prefix = os.path.basename(path).split('-')[0] + '-'
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and name.endswith('.json') and name != os.path.basename(path):
+            try:
+                os.unlink(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+def open_cached(path):
+    ''' opens a cache entry, OSError unless it is a regular file of the current user '''
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0))
+    info = os.fstat(fd)
+    if not stat.S_ISREG(info.st_mode) or info.st_uid != os.getuid():
+        os.close(fd)
+        raise OSError('{} does not belong to the current user'.format(path))
+    return os.fdopen(fd, 'rb')
+
+
+def list_inventory(script, args, build, stream, env_vars, cache):
+    if stream is None:
+        def stream(args, out):
+            out.write(dumps(build(args)))
+            out.write('\n')
+
+    if cache_enabled(args, cache):
+        try:
+            path = cache_path(script, env_vars, args)
+            if not os.path.exists(path):
+                write_cached(path, lambda out: stream(args, out))
+            cached = open_cached(path)
+        except (IOError, OSError):
+            pass
+        else:
+            sys.stdout.flush()
+            with cached:
+                shutil.copyfileobj(cached, getattr(sys.stdout, 'buffer', sys.stdout))
+            return
+    stream(args, sys.stdout)
+
+
+def main(script, build, env_vars=(), add_arguments=None, stream=None, cache=True):
+    '''
+    script is the calling script's __file__ and build(args) returns its inventory dict.
+    env_vars names the environment variables build reads, add_arguments(parser) can add
+    script specific options and stream(args, out) can write the --list JSON directly
+    instead of it being serialized from build's result.  cache=False leaves the --list
+    output uncached unless DYN_INVENTORY_CACHE turns it on.
+    '''
+    parser = ArgumentParser()
+    parser.add_argument('--list', dest='list_instances', action='store_true', default=True,
+                        help='List instances (default: True)')
+    parser.add_argument('--host', dest='requested_host', help='Get all the variables about a specific instance')
+    parser.add_argument('--no-cache', dest='no_cache', action='store_true', default=False,
+                        help='Build the inventory instead of reusing the cached output (env: DYN_INVENTORY_CACHE=0)')
+    if add_arguments:
+        add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.requested_host:
+        hostvars = build(args).get('_meta', {}).get('hostvars', {})
+        print(dumps(hostvars.get(args.requested_host, {})))
+    elif args.list_instances:
+        list_inventory(script, args, build, stream, env_vars, cache)
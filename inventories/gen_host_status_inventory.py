@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+import os
+import random
+from bisect import bisect_right
+
+from dyn_inventory_lib import dumps, main
+
+# Scalable counterpart of for_gen_host_status.ini.  gen_host_status.yml picks
+# each host's outcome from the suffix of its name, so this generates --hosts
+# hosts named <index>_<outcome> with outcomes drawn from --mix, e.g.
+#
+#   ./gen_host_status_inventory.py --hosts 10000 --mix ok=90,failed=5,unreachable=1,changed=4
+#
+# Outcomes missing from the mix get no hosts and whatever the weights leave
+# short of 100 goes to ok.  Hosts are grouped in one gen_host_status_<outcome>
+# group per outcome.
+
+OUTCOMES = ('ok', 'skipped', 'changed', 'failed', 'ignored', 'rescued', 'unreachable')
+
+
+def parse_mix(mix):
+    weights = dict.fromkeys(OUTCOMES, 0.0)
+    for item in mix.split(','):
+        if not item.strip():
+            continue
+        outcome, _, weight = item.partition('=')
+        outcome = outcome.strip()
+        if outcome not in weights:
+            raise ValueError('unknown outcome {!r}, expected one of {}'.format(outcome, ', '.join(OUTCOMES)))
+        weights[outcome] = float(weight)
+    total = sum(weights.values())
+    if total < 100:
+        weights['ok'] += 100 - total
+    return weights
+
+
+def assign_outcomes(host_count, weights, seed):
+    ''' one byte per host holding its outcome index, drawn with a seeded generator '''
+    cumulative = []
+    total = 0.0
+    for outcome in OUTCOMES:
+        total += weights[outcome]
+        cumulative.append(total)
+    rng = random.Random(seed)
+    last = len(OUTCOMES) - 1
+    return bytearray(min(bisect_right(cumulative, rng.random() * total), last) for i in range(host_count))
+
+
+def stream_inventory(args, out):
+    outcomes = assign_outcomes(args.host_count, parse_mix(args.mix), args.seed)
+    width = len(str(max(args.host_count - 1, 0)))
+
+    def name(index):
+        return '{0:0{1}d}_{2}'.format(index, width, OUTCOMES[outcomes[index]])
+
+    out.write('{')
+    for code, outcome in enumerate(OUTCOMES):
+        out.write('{}"gen_host_status_{}":{{"hosts":['.format(',' if code else '', outcome))
+        separator = ''
+        for index in range(args.host_count):
+            if outcomes[index] == code:
+                out.write(separator)
+                out.write(dumps(name(index)))
+                separator = ','
+        out.write(']}')
+    out.write(',"_meta":{"hostvars":{}}}\n')
+
+
+def build_inventory(args):
+    # hostvars are always empty, the whole inventory is only ever streamed
+    return {'_meta': {'hostvars': {}}}
+
+
+def add_arguments(parser):
+    parser.add_argument('--hosts', dest='host_count', type=int,
+                        default=int(os.environ.get('GEN_HOST_STATUS_HOSTS', 1000)),
+                        help='Number of hosts (env: GEN_HOST_STATUS_HOSTS, default: 1000)')
+    parser.add_argument('--mix', dest='mix',
+                        default=os.environ.get('GEN_HOST_STATUS_MIX', 'ok=90,failed=5,unreachable=1,changed=4'),
+                        help='Comma separated outcome=percentage weights out of {} (env: GEN_HOST_STATUS_MIX, '
+                             'default: ok=90,failed=5,unreachable=1,changed=4)'.format(', '.join(OUTCOMES)))
+    parser.add_argument('--seed', dest='seed', type=int,
+                        default=int(os.environ.get('GEN_HOST_STATUS_SEED', 0)),
+                        help='Seed for the outcome of every host (env: GEN_HOST_STATUS_SEED)')
+
+
+if __name__ == '__main__':
+    main(__file__, build_inventory, add_arguments=add_arguments, stream=stream_inventory)
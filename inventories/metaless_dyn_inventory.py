@@ -2,6 +2,24 @@
 from argparse import ArgumentParser
 from pprint import pprint
 import json
+import os
+import signal
+import socket
+import stat
+import sys
+
+try:
+    import socketserver
+except ImportError:
+    import SocketServer as socketserver
+
+# Without _meta the consumer has to call --host once per host.  To cut that
+# cost this script can also resolve many hosts at once with --batch, or run as
+# a long-lived server with --serve SOCKET that answers one host name per line
+# over a unix socket.  --host and --batch query such a server instead of the
+# local data when --socket (or METALESS_INVENTORY_SOCKET) is given.
+# METALESS_INVENTORY_HOSTS=N adds N generated hosts with their own hostvars in
+# a scale group, so the lookups can be timed at scale.
 
 inventory = {'group_one': {'hosts': ['group_one_host_0{}'.format(i) for i in range(1, 6)]
                                     + ['group_one_and_two_host_0{}'.format(i) for i in range(1, 6)]
@@ -27,23 +45,114 @@ hostvars = {'group_one_host_01': {'group_one_host_01_has_this_var': True},
             'group_two_host_01': {'group_two_host_01_has_this_var': True},
             'group_three_host_01': {'group_three_host_01_has_this_var': True}}
 
+scale_hosts = ['scale_host_{:06d}'.format(i) for i in range(int(os.environ.get('METALESS_INVENTORY_HOSTS') or 0))]
+if scale_hosts:
+    inventory['scale'] = {'hosts': scale_hosts}
+    hostvars.update((host, {'scale_index': i, 'ansible_host': '10.{}.{}.{}'.format(i >> 16 & 255, i >> 8 & 255, i & 255)})
+                    for i, host in enumerate(scale_hosts))
+
 
 def dumps(dct):
     return json.dumps(dct, sort_keys=True, indent=4, separators=(',', ': '))
 
 
+def build_index():
+    ''' maps every known host to its serialized hostvars, so lookups are a single dict get '''
+    index = {}
+    for group in inventory.values():
+        for host in group.get('hosts', []):
+            index[host] = json.dumps(hostvars.get(host, {}), sort_keys=True, separators=(',', ':'))
+    return index
+
+
+class HostLookupHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        index = self.server.index
+        for line in self.rfile:
+            # one reply per line, blank ones included, the client reads as many lines as it sent
+            host = line.decode('utf-8').strip()
+            self.wfile.write(index.get(host, '{}').encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class HostLookupServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+
+    daemon_threads = True
+
+    def __init__(self, path):
+        if os.path.lexists(path):
+            if not stat.S_ISSOCK(os.lstat(path).st_mode):
+                raise OSError('{} exists and is not a socket'.format(path))
+            # left behind by a server that did not shut down cleanly
+            os.unlink(path)
+        socketserver.UnixStreamServer.__init__(self, path, HostLookupHandler)
+        self.index = build_index()
+
+
+def serve(path):
+    server = HostLookupServer(path)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(path)
+
+
+def query_server(path, hosts, chunk_size=256):
+    ''' pipelines host names in chunks, reading one JSON line per host before sending the next chunk '''
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(path)
+    try:
+        replies = sock.makefile('rb')
+        results = {}
+        for start in range(0, len(hosts), chunk_size):
+            chunk = hosts[start:start + chunk_size]
+            sock.sendall(''.join(host + '\n' for host in chunk).encode('utf-8'))
+            for host in chunk:
+                results[host] = json.loads(replies.readline().decode('utf-8'))
+        return results
+    finally:
+        sock.close()
+
+
+def resolve(hosts, socket_path=None):
+    if socket_path:
+        return query_server(socket_path, hosts)
+    return dict((host, hostvars.get(host, {})) for host in hosts)
+
+
 def parse_args():
     parser = ArgumentParser()
     parser.add_argument('--list', dest='list_instances', action='store_true', default=True,
                         help='List instances (default: True)')
     parser.add_argument('--host', dest='requested_host', help='Get all the variables about a specific instance')
+    parser.add_argument('--batch', dest='requested_hosts', nargs='+', metavar='HOST',
+                        help='Get the variables of several instances at once, keyed by host name '
+                             '("-" reads host names from stdin, one per line)')
+    parser.add_argument('--serve', dest='serve_socket', metavar='SOCKET',
+                        help='Answer host lookups on this unix socket until interrupted')
+    parser.add_argument('--socket', dest='socket_path', metavar='SOCKET',
+                        default=os.environ.get('METALESS_INVENTORY_SOCKET'),
+                        help='Resolve --host/--batch through a running --serve instance '
+                             '(env: METALESS_INVENTORY_SOCKET)')
     return parser.parse_args()
 
 
 def load_inventory():
     args = parse_args()
-    if args.requested_host:
-        print(dumps(hostvars.get(args.requested_host, {})))
+    if args.serve_socket:
+        serve(args.serve_socket)
+    elif args.requested_hosts:
+        hosts = args.requested_hosts
+        if hosts == ['-']:
+            hosts = [line.strip() for line in sys.stdin if line.strip()]
+        print(dumps(resolve(hosts, args.socket_path)))
+    elif args.requested_host:
+        print(dumps(resolve([args.requested_host], args.socket_path)[args.requested_host]))
     elif args.list_instances:
         print(dumps(inventory))
     else:
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+from argparse import ArgumentParser
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Compares the ways of resolving hostvars from metaless_dyn_inventory.py: one
+# process per --host call, a single --batch call, and a --serve instance.  The
+# server is timed the way a consumer uses it, one --socket --host process per
+# host, and from within this process over its unix socket, per host and
+# pipelined, which leaves out the interpreter startup.  Every lookup count runs against an inventory
+# of that many generated hosts (METALESS_INVENTORY_HOSTS), each looked up
+# once, so the server index and the --batch result grow with it.  Per-process
+# lookups are slow enough that only a sample is timed by default and the total
+# is extrapolated from it.
+
+here = os.path.dirname(os.path.abspath(__file__))
+script = os.path.join(here, 'metaless_dyn_inventory.py')
+sys.path.insert(0, here)
+from metaless_dyn_inventory import query_server  # noqa: E402
+
+
+def run_script(*args, **kwargs):
+    return subprocess.check_output([sys.executable, script] + list(args), **kwargs)
+
+
+def lookup_hosts(count):
+    ''' sizes the inventory to count generated hosts, in the environment every later run inherits '''
+    os.environ['METALESS_INVENTORY_HOSTS'] = str(count)
+    inventory = json.loads(run_script('--list').decode('utf-8'))
+    return inventory['scale']['hosts']
+
+
+def time_per_process(hosts, sample, *args):
+    timed = hosts[:sample] if sample else hosts
+    start = time.time()
+    for host in timed:
+        run_script('--host', host, *args)
+    elapsed = time.time() - start
+    return elapsed * len(hosts) / len(timed), len(timed) < len(hosts)
+
+
+def time_batched(hosts):
+    start = time.time()
+    run_script('--batch', '-', input='\n'.join(hosts).encode('utf-8'))
+    return time.time() - start
+
+
+def time_server(hosts, sample):
+    path = os.path.join(tempfile.mkdtemp(), 'metaless.sock')
+    server = subprocess.Popen([sys.executable, script, '--serve', path])
+    try:
+        while not os.path.exists(path):
+            time.sleep(0.01)
+        per_process = time_per_process(hosts, sample, '--socket', path)
+        start = time.time()
+        for host in hosts:
+            query_server(path, [host])
+        single = time.time() - start
+        start = time.time()
+        query_server(path, hosts)
+        pipelined = time.time() - start
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(os.path.dirname(path))
+    return per_process, single, pipelined
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument('--lookups', dest='lookups', type=int, nargs='+', default=[1000, 10000],
+                        help='Inventory sizes to time, every host is looked up once (default: 1000 10000)')
+    parser.add_argument('--sample', dest='sample', type=int, default=100,
+                        help='Per-process lookups actually run before extrapolating, 0 runs them all (default: 100)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print('{:>8}  {:>14}  {:>10}  {:>14}  {:>14}  {:>16}'.format(
+        'lookups', 'per-process', 'batched', 'server/process', 'server/host', 'server/pipelined'))
+    any_extrapolated = False
+    for count in args.lookups:
+        hosts = lookup_hosts(count)
+        per_process, extrapolated = time_per_process(hosts, args.sample)
+        batched = time_batched(hosts)
+        (server_process, _), single, pipelined = time_server(hosts, args.sample)
+        any_extrapolated = any_extrapolated or extrapolated
+        mark = '*' if extrapolated else 's'
+        print('{:>8}  {:>13.3f}{}  {:>9.3f}s  {:>13.3f}{}  {:>13.3f}s  {:>15.3f}s'.format(
+            count, per_process, mark, batched, server_process, mark, single, pipelined))
+    if any_extrapolated:
+        print('* extrapolated from {} per-process lookups'.format(args.sample))
+
+
+if __name__ == '__main__':
+    main()
@@ -8,16 +8,73 @@ DOCUMENTATION = r'''
     description:
         - Ignores whatever you give it
         - Returns inventory containing "moooooo"
+        - When host_count is set, also returns a herd of synthetic hosts spread over a tree of groups,
+          which is useful to measure how inventory parsing scales with host and group count
+        - The herd layout is computed in one pass and can be stored in the inventory cache,
+          so a second parse of the same config skips computing it
+    extends_documentation_fragment:
+        - inventory_cache
+    options:
+        plugin:
+            description: Token that ensures this is a source file for the 'cow' plugin.
+            required: True
+            choices: ['cow']
+        host_count:
+            description: Number of synthetic hosts to add.
+            type: int
+            default: 0
+        group_fanout:
+            description: Number of child groups below each group of the herd.
+            type: int
+            default: 2
+        nesting_depth:
+            description: Number of group levels below the C(herd) group, hosts are spread over the deepest level.
+            type: int
+            default: 1
+        vars_size:
+            description: Length of the C(moo) variable set on every synthetic host.
+            type: int
+            default: 0
 '''
 
 EXAMPLES = r'''
     # mooooo
+    plugin: cow
+    host_count: 10000
+    group_fanout: 4
+    nesting_depth: 3
+    vars_size: 256
+    cache: true
+    cache_plugin: jsonfile
+    cache_connection: /tmp/cow_inventory_cache
 '''
 
-from ansible.plugins.inventory import BaseInventoryPlugin
+import time
 
+from ansible.plugins.inventory import BaseInventoryPlugin, Cacheable
+from ansible.utils.display import Display
 
-class InventoryModule(BaseInventoryPlugin):
+display = Display()
+
+
+def herd_layout(host_count, group_fanout, nesting_depth, vars_size):
+    ''' computes the group tree and host membership of the herd as plain, cacheable data '''
+    group_fanout = max(1, group_fanout)
+    children = []
+    level = ['herd']
+    for depth in range(1, max(1, nesting_depth) + 1):
+        next_level = ['herd_%d_%d' % (depth, index) for index in range(len(level) * group_fanout)]
+        children.extend((level[index // group_fanout], child) for index, child in enumerate(next_level))
+        level = next_level
+
+    width = len(str(max(host_count - 1, 0)))
+    hosts = ['cow_%0*d' % (width, index) for index in range(host_count)]
+    # host i goes to leaf group i % len(level); slicing builds every leaf's host list at once
+    members = dict((leaf, hosts[index::len(level)]) for index, leaf in enumerate(level))
+    return {'children': children, 'members': members, 'moo': 'm' + 'o' * (vars_size - 1) if vars_size > 0 else None}
+
+
+class InventoryModule(BaseInventoryPlugin, Cacheable):
 
     NAME = 'cow'
 
@@ -25,3 +82,43 @@ class InventoryModule(BaseInventoryPlugin):
         ''' doesnt parse the inventory file, but claims it did anyway '''
         super(InventoryModule, self).parse(inventory, loader, host_list)
         self.inventory.add_host('moooooo')
+
+        self._read_config_data(host_list)
+        if not self.get_option('host_count'):
+            return
+
+        start = time.time()
+        herd_options = [self.get_option(option)
+                        for option in ('host_count', 'group_fanout', 'nesting_depth', 'vars_size')]
+        # the layout depends on the herd options too, not just on which file they came from
+        cache_key = '%s_%s' % (self.get_cache_key(host_list), '_'.join(str(option) for option in herd_options))
+        use_cache = self.get_option('cache') and cache
+        update_cache = self.get_option('cache') and not cache
+        layout = None
+        if use_cache:
+            try:
+                layout = self._cache[cache_key]
+            except KeyError:
+                update_cache = True
+        if layout is None:
+            layout = herd_layout(*herd_options)
+        if update_cache:
+            self._cache[cache_key] = layout
+
+        self._populate(layout)
+        display.v('cow: added %d hosts in %.3fs (%s)' % (self.get_option('host_count'), time.time() - start,
+                                                        'cached layout' if use_cache and not update_cache
+                                                        else 'computed layout'))
+
+    def _populate(self, layout):
+        self.inventory.add_group('herd')
+        for parent, child in layout['children']:
+            self.inventory.add_group(child)
+            self.inventory.add_child(parent, child)
+        moo = layout['moo']
+        for leaf, hosts in layout['members'].items():
+            for host in hosts:
+                # add_host with group= covers membership, no separate add_child per host
+                self.inventory.add_host(host, group=leaf)
+                if moo is not None:
+                    self.inventory.set_variable(host, 'moo', moo)
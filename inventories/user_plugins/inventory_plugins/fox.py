@@ -8,13 +8,55 @@ DOCUMENTATION = r'''
     description:
         - Ignores whatever you give it
         - You will never find out what the fox says
+        - With host_count set it first adds that many hosts, optionally slowly and holding memory,
+          so the time and memory an update spends before rolling back can be measured
+    options:
+        plugin:
+            description: Token that ensures this is a source file for the 'fox' plugin.
+            required: True
+            choices: ['fox']
+        host_count:
+            description: Number of hosts to add besides C(fox).
+            type: int
+            default: 0
+        delay:
+            description: Seconds to sleep every I(delay_every) hosts.
+            type: float
+            default: 0
+        delay_every:
+            description: Number of hosts added between two delays.
+            type: int
+            default: 1
+        fail_after:
+            description:
+                - Fraction of I(host_count) added before the error is raised, 0 fails before adding any.
+                - Set to a negative value to never fail.
+            type: float
+            default: 0
+        ballast_size:
+            description: Size in characters of the C(ballast) variable held by every added host.
+            type: int
+            default: 0
 '''
 
 EXAMPLES = r'''
     # plugin: fox
+
+    # half-built inventory of 50000 hosts holding 1KB each, failing after 80% of it
+    plugin: fox
+    host_count: 50000
+    delay: 0.01
+    delay_every: 100
+    fail_after: 0.8
+    ballast_size: 1024
 '''
 
+import time
+
 from ansible.plugins.inventory import BaseInventoryPlugin
+from ansible.utils.display import Display
+
+display = Display()
 
 
 def ancient_mystery():
@@ -29,4 +71,28 @@ class InventoryModule(BaseInventoryPlugin):
         ''' doesnt parse the inventory file, but claims it did anyway '''
         super(InventoryModule, self).parse(inventory, loader, host_list)
         self.inventory.add_host('fox')  # could be used to test rollback
-        ancient_mystery()
+        self._read_config_data(host_list)
+
+        host_count = self.get_option('host_count')
+        fail_after = self.get_option('fail_after')
+        fail_at = int(host_count * fail_after) if fail_after >= 0 else None
+        delay = self.get_option('delay')
+        delay_every = max(1, self.get_option('delay_every'))
+        ballast_size = self.get_option('ballast_size')
+
+        start = time.time()
+        width = len(str(max(host_count - 1, 0)))
+        added = 0
+        while added < host_count and added != fail_at:
+            host = 'fox_%0*d' % (width, added)
+            self.inventory.add_host(host)
+            if ballast_size > 0:
+                # a new string per host, so the ballast really adds up
+                self.inventory.set_variable(host, 'ballast', '%0*d' % (ballast_size, added))
+            added += 1
+            if delay and added % delay_every == 0:
+                time.sleep(delay)
+        display.v('fox: added %d of %d hosts in %.3fs' % (added, host_count, time.time() - start))
+
+        if fail_at is not None:
+            ancient_mystery()
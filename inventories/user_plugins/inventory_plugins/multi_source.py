@@ -0,0 +1,149 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+    inventory: multi_source
+    version_added: "2.9"
+    short_description: Loads several inventory sources concurrently and merges them
+    description:
+        - Runs every listed source at the same time in a thread pool and merges the results
+          in the order the sources are declared, so later sources win on conflicting variables.
+        - By default each source is loaded with C(ansible-inventory --list --export), which picks up
+          the group_vars/host_vars directories next to it. Sources using the C(script) runner are
+          executed directly with C(--list), which is faster but skips those directories.
+        - The time each source took is shown with -v and can be stored in a variable of the C(all) group.
+    options:
+        plugin:
+            description: Token that ensures this is a source file for the 'multi_source' plugin.
+            required: True
+            choices: ['multi_source']
+        sources:
+            description:
+                - Inventory sources to load, relative to this file.
+                - Items are either a path or a dict with C(path) and C(runner) (C(ansible-inventory) or C(script)).
+            type: list
+            required: True
+        max_workers:
+            description: Number of sources loaded at the same time, defaults to one worker per source.
+            type: int
+        runner:
+            description: Runner used for sources that do not set their own.
+            type: str
+            default: ansible-inventory
+            choices: ['ansible-inventory', 'script']
+        ansible_inventory_executable:
+            description: Path of the ansible-inventory executable.
+            type: str
+            default: ansible-inventory
+        timings_var:
+            description: When set, per source load times in seconds are stored in this variable of the C(all) group.
+            type: str
+'''
+
+EXAMPLES = r'''
+    # multi_source.yaml
+    plugin: multi_source
+    sources:
+      - ../dyn_inventory.py
+      - ../more_inventories/dyn_inventory.py
+      - path: ../more_inventories/even_more_inventories/inventory.ini
+    timings_var: multi_source_timings
+'''
+
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ansible.errors import AnsibleParserError
+from ansible.module_utils._text import to_native, to_text
+from ansible.plugins.inventory import BaseInventoryPlugin
+from ansible.utils.display import Display
+
+display = Display()
+
+
+def run_command(command):
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stdout, stderr = proc.communicate()
+    if proc.returncode != 0:
+        raise AnsibleParserError('%s failed with rc=%d: %s' % (' '.join(command), proc.returncode,
+                                                                to_native(stderr).strip()))
+    return json.loads(to_text(stdout, errors='surrogate_or_strict'))
+
+
+def load_source(path, runner, executable):
+    ''' returns the --list style dict of a source together with the time it took to load '''
+    start = time.time()
+    if runner == 'script':
+        data = run_command([path, '--list'])
+        if '_meta' not in data:
+            hosts = set()
+            for group in data.values():
+                if isinstance(group, dict):
+                    hosts.update(group.get('hosts', []))
+                elif isinstance(group, list):
+                    hosts.update(group)
+            data['_meta'] = {'hostvars': dict((host, run_command([path, '--host', host])) for host in sorted(hosts))}
+    else:
+        data = run_command([executable, '-i', path, '--list', '--export'])
+    return data, time.time() - start
+
+
+class InventoryModule(BaseInventoryPlugin):
+
+    NAME = 'multi_source'
+
+    def verify_file(self, path):
+        ''' only yaml config files can be multi_source sources '''
+        return super(InventoryModule, self).verify_file(path) and path.endswith(('.yml', '.yaml'))
+
+    def parse(self, inventory, loader, path, cache=True):
+        super(InventoryModule, self).parse(inventory, loader, path)
+        self._read_config_data(path)
+
+        basedir = os.path.dirname(path)
+        sources = []
+        for source in self.get_option('sources'):
+            if not isinstance(source, dict):
+                source = {'path': source}
+            sources.append((os.path.normpath(os.path.join(basedir, source['path'])),
+                            source.get('runner', self.get_option('runner'))))
+
+        executable = self.get_option('ansible_inventory_executable')
+        workers = self.get_option('max_workers') or len(sources) or 1
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(load_source, source_path, runner, executable)
+                       for source_path, runner in sources]
+            # results are consumed in declared order, whatever order they finish in
+            results = [future.result() for future in futures]
+
+        timings = {}
+        for (source_path, runner), (data, elapsed) in zip(sources, results):
+            display.v('multi_source: loaded %s in %.3fs' % (source_path, elapsed))
+            timings[source_path] = round(elapsed, 6)
+            self._merge(data)
+
+        if self.get_option('timings_var'):
+            self.inventory.set_variable('all', self.get_option('timings_var'), timings)
+
+    def _merge(self, data):
+        for group, group_data in data.items():
+            if group == '_meta':
+                continue
+            self.inventory.add_group(group)
+            if isinstance(group_data, list):
+                group_data = {'hosts': group_data}
+            for host in group_data.get('hosts', []):
+                self.inventory.add_host(host, group=group)
+            for child in group_data.get('children', []):
+                self.inventory.add_group(child)
+                self.inventory.add_child(group, child)
+            for varname, value in group_data.get('vars', {}).items():
+                self.inventory.set_variable(group, varname, value)
+
+        for host, hostvars in data.get('_meta', {}).get('hostvars', {}).items():
+            self.inventory.add_host(host)
+            for varname, value in hostvars.items():
+                self.inventory.set_variable(host, varname, value)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import time
+
+from ansible.module_utils.basic import AnsibleModule
+
+DOCUMENTATION = '''
+---
+module: async_status_batch
+short_description: Wait for many async jobs in a single task.
+description:
+    - Checks the status files of all given async jobs in one module run, polling them on a backoff
+      schedule until they have all finished, I(quorum) of them have finished or I(timeout) runs out.
+    - Replaces one C(async_status) task with until/retries per job, where every retry is a separate module run.
+    - Goes with the async_status_batch action plugin, which finds the async directory
+      and accepts registered async results as well as job ids.
+version_added: "2.9"
+options:
+    jids:
+        description:
+            - Job ids to wait for, or the registered results of tasks started with C(poll: 0).
+        required: true
+    quorum:
+        description:
+            - Number of finished jobs to wait for, 0 waits for all of them.
+        default: 0
+    timeout:
+        description:
+            - Seconds to wait before giving up.
+        default: 300
+    delay:
+        description:
+            - Seconds to wait before the second check, the first check happens right away.
+            - Delays below 0.1 seconds are raised to 0.1, so the status files are not re-read back to back.
+        default: 0.5
+    backoff:
+        description:
+            - Factor the delay grows by after every check that does not reach the quorum.
+        default: 1.5
+    max_delay:
+        description:
+            - Upper limit of the delay between checks.
+        default: 5
+    cleanup:
+        description:
+            - Remove the status files of finished jobs.
+        default: false
+requirements: []
+'''
+
+EXAMPLES = '''
+- shell: sleep {{ 10 | random }}
+  async: 60
+  poll: 0
+  loop: "{{ range(100) | list }}"
+  register: fired
+
+- async_status_batch:
+    jids: "{{ fired.results }}"
+  register: jobs
+'''
+
+RETURN = '''
+jobs:
+    description: Last read status of every job, keyed by job id.
+    returned: always
+    type: dict
+finished:
+    description: Ids of the finished jobs.
+    returned: always
+    type: list
+pending:
+    description: Ids of the jobs that had not finished when the task returned.
+    returned: always
+    type: list
+failed_jobs:
+    description: Ids of the finished jobs that failed.
+    returned: always
+    type: list
+polls:
+    description: Number of times the status files were checked.
+    returned: always
+    type: int
+elapsed:
+    description: Seconds spent waiting.
+    returned: always
+    type: float
+'''
+
+MIN_DELAY = 0.1
+
+
+def read_status(path):
+    ''' status of one job, a running placeholder when the file is missing or half written '''
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (IOError, OSError):
+        return {'started': 1, 'finished': 0, 'msg': 'status file not found yet'}
+    except ValueError:
+        return {'started': 1, 'finished': 0, 'msg': 'status file not parseable yet'}
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            jids=dict(type='list', required=True),
+            quorum=dict(type='int', default=0),
+            timeout=dict(type='float', default=300),
+            delay=dict(type='float', default=0.5),
+            backoff=dict(type='float', default=1.5),
+            max_delay=dict(type='float', default=5),
+            cleanup=dict(type='bool', default=False),
+            _async_dir=dict(type='path', default='~/.ansible_async')),
+        supports_check_mode=True)
+
+    params = module.params
+    async_dir = os.path.expanduser(params['_async_dir'])
+    jids = [str(jid) for jid in params['jids']]
+    quorum = params['quorum'] if 0 < params['quorum'] <= len(jids) else len(jids)
+
+    jobs = {}
+    pending = list(jids)
+    delay = max(params['delay'], MIN_DELAY)
+    polls = 0
+    start = time.time()
+    while True:
+        polls += 1
+        still_pending = []
+        for jid in pending:
+            status = read_status(os.path.join(async_dir, jid))
+            jobs[jid] = status
+            # async_wrapper replaces its started placeholder with the module result when the job ends,
+            # so like async_status a status without 'started' is a finished job
+            if 'started' in status:
+                still_pending.append(jid)
+            else:
+                status['finished'] = 1
+                status['ansible_job_id'] = jid
+        pending = still_pending
+        if len(jids) - len(pending) >= quorum:
+            break
+        remaining = params['timeout'] - (time.time() - start)
+        if remaining <= 0:
+            break
+        time.sleep(min(delay, remaining))
+        delay = max(min(delay * params['backoff'], params['max_delay']), MIN_DELAY)
+    elapsed = time.time() - start
+
+    pending_set = set(pending)
+    finished = [jid for jid in jids if jid not in pending_set]
+    failed_jobs = [jid for jid in finished if jobs[jid].get('failed') or (jobs[jid].get('rc') or 0) != 0]
+    if params['cleanup'] and not module.check_mode:
+        for jid in finished:
+            try:
+                os.unlink(os.path.join(async_dir, jid))
+            except OSError:
+                pass
+
+    result = dict(changed=False, jobs=jobs, finished=finished, pending=pending, failed_jobs=failed_jobs,
+                  polls=polls, elapsed=elapsed)
+    if len(finished) < quorum:
+        module.fail_json(msg='%d of %d jobs finished within %ss, %d were needed'
+                         % (len(finished), len(jids), params['timeout'], quorum), **result)
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import grp
+import os
+import pwd
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils._text import to_native
+
+DOCUMENTATION = '''
+---
+module: batch_file
+short_description: Manage the state of many paths in a single module run.
+description:
+    - Applies the same state, mode and ownership to a list of paths, optionally with a pool of threads.
+    - Does the work of a C(file) task looped over every path, without paying the per-task overhead for each of them.
+version_added: "2.9"
+options:
+    paths:
+        description:
+            - Paths to manage.
+    pattern:
+        description:
+            - printf style pattern generating paths from I(start) to I(start) + I(count) - 1, used with or instead of I(paths).
+    count:
+        description:
+            - Number of paths generated from I(pattern).
+        default: 0
+    start:
+        description:
+            - First number substituted into I(pattern).
+        default: 0
+    state:
+        description:
+            - C(directory) creates missing directories, C(touch) creates files or updates their times,
+              C(absent) removes files and directory trees.
+        choices: [directory, touch, absent]
+        default: directory
+    mode:
+        description:
+            - Octal permissions of the paths, symbolic modes are not supported.
+    owner:
+        description:
+            - Name or id of the user owning the paths.
+    group:
+        description:
+            - Name or id of the group owning the paths.
+    workers:
+        description:
+            - Number of threads applying the paths at the same time.
+        default: 1
+requirements: []
+'''
+
+EXAMPLES = '''
+- batch_file:
+    pattern: /opt/test/%04d
+    count: 1000
+    state: directory
+    mode: 0o0700
+    workers: 8
+
+- batch_file:
+    paths:
+      - /opt/test/a
+      - /opt/test/b
+    state: absent
+'''
+
+RETURN = '''
+changed_paths:
+    description: Paths that were changed, in the order they were given.
+    returned: always
+    type: list
+failed_paths:
+    description: Error message for every path that could not be applied.
+    returned: always
+    type: dict
+unchanged:
+    description: Number of paths that were already in the requested state.
+    returned: always
+    type: int
+elapsed:
+    description: Seconds spent applying the paths.
+    returned: always
+    type: float
+'''
+
+
+def parse_mode(mode):
+    if mode is None or isinstance(mode, int):
+        return mode
+    try:
+        return int(mode, 8)
+    except ValueError:
+        return int(mode, 0)
+
+
+def resolve_id(name, lookup):
+    if name is None:
+        return -1
+    try:
+        return int(name)
+    except ValueError:
+        return lookup(name)[2]
+
+
+def apply_path(path, state, mode, uid, gid, check_mode):
+    ''' returns True when path was (or would be) changed '''
+    exists = os.path.lexists(path)
+    if state == 'absent':
+        if exists and not check_mode:
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path)
+            else:
+                os.unlink(path)
+        return exists
+
+    changed = False
+    if state == 'directory':
+        if exists and not os.path.isdir(path):
+            raise OSError('%s exists and is not a directory' % path)
+        if not exists:
+            changed = True
+            if check_mode:
+                return True
+            os.makedirs(path)
+    elif state == 'touch':
+        changed = True
+        if check_mode:
+            return True
+        with open(path, 'a'):
+            os.utime(path, None)
+
+    st = os.stat(path)
+    if mode is not None and (st.st_mode & 0o7777) != mode:
+        changed = True
+        if not check_mode:
+            os.chmod(path, mode)
+    if (uid != -1 and st.st_uid != uid) or (gid != -1 and st.st_gid != gid):
+        changed = True
+        if not check_mode:
+            os.chown(path, uid, gid)
+    return changed
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            paths=dict(type='list', default=[]),
+            pattern=dict(type='str'),
+            count=dict(type='int', default=0),
+            start=dict(type='int', default=0),
+            state=dict(type='str', default='directory', choices=['directory', 'touch', 'absent']),
+            mode=dict(type='raw'),
+            owner=dict(type='str'),
+            group=dict(type='str'),
+            workers=dict(type='int', default=1)),
+        supports_check_mode=True)
+
+    params = module.params
+    paths = list(params['paths'])
+    if params['pattern']:
+        paths.extend(params['pattern'] % i for i in range(params['start'], params['start'] + params['count']))
+    try:
+        mode = parse_mode(params['mode'])
+        uid = resolve_id(params['owner'], pwd.getpwnam)
+        gid = resolve_id(params['group'], grp.getgrnam)
+    except (KeyError, ValueError) as e:
+        module.fail_json(msg='invalid mode, owner or group: %s' % to_native(e))
+
+    def apply(path):
+        try:
+            return apply_path(path, params['state'], mode, uid, gid, module.check_mode), None
+        except (IOError, OSError) as e:
+            return False, to_native(e)
+
+    start = time.time()
+    if params['workers'] > 1:
+        with ThreadPoolExecutor(max_workers=params['workers']) as executor:
+            results = list(executor.map(apply, paths))
+    else:
+        results = [apply(path) for path in paths]
+    elapsed = time.time() - start
+
+    changed_paths = [path for path, (changed, error) in zip(paths, results) if changed]
+    failed_paths = dict((path, error) for path, (changed, error) in zip(paths, results) if error)
+    result = dict(changed=bool(changed_paths), changed_paths=changed_paths, failed_paths=failed_paths,
+                  unchanged=len(paths) - len(changed_paths) - len(failed_paths), elapsed=elapsed)
+    if failed_paths:
+        module.fail_json(msg='%d of %d paths failed' % (len(failed_paths), len(paths)), **result)
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# The work happens in action_plugins/event_storm.py on the controller, this
+# file only holds the documentation.
+
+DOCUMENTATION = '''
+---
+module: event_storm
+short_description: Produce a configurable amount of stdout at a target rate.
+description:
+    - Writes I(lines) lines to the controller's display, I(burst) lines per write, paced to I(rate) lines per second,
+      and returns a result payload of I(payload_size) characters.
+    - Every write is a separate display call while the task runs, so the lines reach the callback and event
+      pipeline over time instead of in one result at the end. Unlike looping a debug task, the output volume
+      does not come with per-task overhead, so the pipeline can be measured on its own.
+    - A display write blocks while the consumer of the output falls behind, so once the pipeline saturates
+      C(achieved_rate) drops below the target and C(max_lag) grows.
+    - Runs on the controller as an action plugin, nothing is executed on the host.
+version_added: "2.9"
+options:
+    lines:
+        description:
+            - Number of stdout lines to produce.
+        default: 1000
+    line_size:
+        description:
+            - Length of every line in characters.
+        default: 80
+    rate:
+        description:
+            - Target rate in lines per second, 0 produces them as fast as possible.
+        default: 0
+    burst:
+        description:
+            - Lines written in one display call before pausing, the average still follows I(rate).
+        default: 1
+    payload_size:
+        description:
+            - Length of the C(payload) string added to the result.
+        default: 0
+requirements: []
+'''
+
+EXAMPLES = '''
+# 10000 lines at 500 lines/s, in bursts of 100
+- event_storm:
+    lines: 10000
+    rate: 500
+    burst: 100
+    payload_size: 65536
+'''
+
+RETURN = '''
+payload:
+    description: String of I(payload_size) characters.
+    returned: always
+    type: str
+lines_produced:
+    description: Number of lines produced.
+    returned: always
+    type: int
+elapsed:
+    description: Seconds spent writing the lines.
+    returned: always
+    type: float
+achieved_rate:
+    description: Lines per second actually written.
+    returned: always
+    type: float
+max_lag:
+    description: Largest delay in seconds between when a burst was due and when it was written.
+    returned: always
+    type: float
+target_rate:
+    description: The requested I(rate).
+    returned: always
+    type: float
+'''
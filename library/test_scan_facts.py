@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import os
+import random
 
 from ansible.module_utils.basic import * # noqa
 
@@ -11,8 +12,31 @@ module: scan_facts
 short_description: Return sample facts into facts namespace.
 description:
     - Return sample facts into facts namespace.
+    - With size set, also returns a generated C(scan_payload) fact of roughly that many characters,
+      to stress fact caching and event storage with large payloads.
 version_added: "2.3"
 options:
+    size:
+        description:
+            - Number of characters in the strings of the generated C(scan_payload) fact, 0 leaves it out.
+            - Non-ASCII characters are escaped in the module output, so it grows with I(unicode_ratio).
+        default: 0
+    depth:
+        description:
+            - Nesting depth of C(scan_payload), every level splits into two branches.
+        default: 2
+    list_length:
+        description:
+            - Number of strings in each list at the bottom of C(scan_payload).
+        default: 10
+    unicode_ratio:
+        description:
+            - Fraction of non-ASCII characters in the generated strings.
+        default: 0.1
+    seed:
+        description:
+            - Seed for the generated strings, the same options and seed always give the same payload.
+        default: 0
 requirements: []
 author: Chris Meyers, Christopher Wang
 '''
@@ -42,11 +66,55 @@ EXAMPLES = '''
     },
     "changed": false
 }
+
+# About 4MB of extra facts, nested 4 levels deep
+- test_scan_facts:
+    size: 4000000
+    depth: 4
+    list_length: 50
 '''
 
+ASCII_CHARS = bytearray(b'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789')
+UNICODE_CHARS = u"鵟犭酜귃ꔀꈛ竳䙭韽ࠔ"
+
+
+def generate_strings(rng, count, length, unicode_ratio):
+    ''' draws every character in bulk, then slices them into count strings of length characters '''
+    unicode_length = int(round(length * max(0.0, min(unicode_ratio, 1.0))))
+    ascii_length = length - unicode_length
+    table = bytes(bytearray(ASCII_CHARS[i % len(ASCII_CHARS)] for i in range(256)))
+    ascii_size = count * ascii_length
+    # getrandbits(0) raises before Python 3.9
+    ascii_bytes = rng.getrandbits(ascii_size * 8).to_bytes(ascii_size, 'little') if ascii_size else b''
+    ascii_chars = ascii_bytes.translate(table).decode('ascii')
+    unicode_chars = u''.join(rng.choices(UNICODE_CHARS, k=count * unicode_length))
+    return [ascii_chars[i * ascii_length:(i + 1) * ascii_length]
+            + unicode_chars[i * unicode_length:(i + 1) * unicode_length] for i in range(count)]
+
+
+def build_payload(size, depth, list_length, unicode_ratio, seed):
+    depth = max(0, depth)
+    list_length = max(1, list_length)
+    lists = 2 ** depth
+    strings = generate_strings(random.Random(seed), lists * list_length,
+                               max(1, size // (lists * list_length)), unicode_ratio)
+
+    def branch(level, index):
+        if level == depth:
+            return strings[index * list_length:(index + 1) * list_length]
+        return {'branch_0': branch(level + 1, index * 2), 'branch_1': branch(level + 1, index * 2 + 1)}
+
+    return branch(0, 0)
+
+
 def main():
     module = AnsibleModule(
-        argument_spec = dict())
+        argument_spec = dict(
+            size=dict(type='int', default=0),
+            depth=dict(type='int', default=2),
+            list_length=dict(type='int', default=10),
+            unicode_ratio=dict(type='float', default=0.1),
+            seed=dict(type='int', default=0)))
 
     string="abc"
     unicode_string="鵟犭酜귃ꔀꈛ竳䙭韽ࠔ"
@@ -67,6 +135,10 @@ def main():
 
     results = dict(ansible_facts=dict(string=string, unicode_string=unicode_string, int=int, float=float, bool=bool,
                                       null=null, list=list, obj=obj, empty_list=empty_list, empty_obj=empty_obj))
+    if module.params['size']:
+        results['ansible_facts']['scan_payload'] = build_payload(module.params['size'], module.params['depth'],
+                                                                 module.params['list_length'],
+                                                                 module.params['unicode_ratio'], module.params['seed'])
     module.exit_json(**results)
 
 main()
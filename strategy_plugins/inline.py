@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    strategy: inline
+    short_description: Runs controller only actions in the main process, everything else like linear or free
+    description:
+        - Tasks whose action only ever runs on the controller (C(debug), C(set_fact), C(assert), C(fail) and
+          C(set_stats)) are executed right away in the main process instead of being handed to a forked worker,
+          and their results go straight to the pending results instead of through the results queue.
+          A play made only of such tasks never forks a worker.
+        - Tasks with C(delegate_to) or C(async), and all other actions, are queued to workers as usual.
+        - Scheduling is that of the linear strategy, or of free when C(ANSIBLE_INLINE_STRATEGY_BASE=free).
+        - utils/benchmark_inline_strategy.py compares it with linear and free.
+    version_added: "2.9"
+'''
+
+import inspect
+import os
+import traceback
+
+from ansible.executor.task_executor import TaskExecutor
+from ansible.executor.task_result import TaskResult
+from ansible.module_utils._text import to_text
+from ansible.utils.display import Display
+
+if os.environ.get('ANSIBLE_INLINE_STRATEGY_BASE', 'linear') == 'free':
+    from ansible.plugins.strategy.free import StrategyModule as BaseStrategyModule
+else:
+    from ansible.plugins.strategy.linear import StrategyModule as BaseStrategyModule
+
+try:
+    from ansible.plugins.strategy import SharedPluginLoaderObj
+except ImportError:
+    # newer releases hand the loader module itself to the executor
+    SharedPluginLoaderObj = None
+    from ansible.plugins import loader as plugin_loader
+
+display = Display()
+
+INLINE_ACTIONS = frozenset(('debug', 'set_fact', 'assert', 'fail', 'set_stats'))
+try:
+    EXECUTOR_ARGS = list(inspect.signature(TaskExecutor.__init__).parameters)
+except AttributeError:
+    EXECUTOR_ARGS = inspect.getargspec(TaskExecutor.__init__).args
+
+
+class StrategyModule(BaseStrategyModule):
+
+    def __init__(self, tqm):
+        super(StrategyModule, self).__init__(tqm)
+        self._inline_stdin = open(os.devnull)
+        self._inline_loader = SharedPluginLoaderObj() if SharedPluginLoaderObj else plugin_loader
+
+    def _inline(self, task):
+        action = task.action.rsplit('.', 1)[-1] if task.action.startswith('ansible.builtin.') else task.action
+        return action in INLINE_ACTIONS and not task.delegate_to and not task.async_val
+
+    def _queue_task(self, host, task, task_vars, play_context):
+        if not self._inline(task):
+            return super(StrategyModule, self)._queue_task(host, task, task_vars, play_context)
+
+        display.debug("running %s for %s inline" % (task.action, host.name))
+        self._queued_task_cache[(host.name, task._uuid)] = {
+            'host': host,
+            'task': task,
+            'task_vars': task_vars,
+            'play_context': play_context,
+        }
+        self._tqm.send_callback('v2_runner_on_start', host, task)
+
+        # the executor templates the task in place, a worker gets a forked copy of it
+        task = task.copy()
+        args = [host, task, task_vars.copy(), play_context, self._inline_stdin, self._loader, self._inline_loader,
+                self._final_q]
+        if 'variable_manager' in EXECUTOR_ARGS:
+            args.append(self._variable_manager)
+        try:
+            result = TaskExecutor(*args).run()
+        except Exception:
+            result = dict(failed=True, exception=to_text(traceback.format_exc()), stdout='')
+
+        task_result = TaskResult(host.name, task._uuid, result, task_fields=task.dump_attrs())
+        if hasattr(self, 'normalize_task_result'):
+            task_result = self.normalize_task_result(task_result) or task_result
+        with self._results_lock:
+            # only handlers have listen set, the same split results_thread_main makes
+            if 'listen' in task_result._task_fields:
+                self._handler_results.append(task_result)
+            else:
+                self._results.append(task_result)
+        self._pending_results += 1
+
+    def cleanup(self):
+        try:
+            super(StrategyModule, self).cleanup()
+        finally:
+            self._inline_stdin.close()
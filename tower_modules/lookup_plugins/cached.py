@@ -0,0 +1,182 @@
+# python 3 headers, required if submitting to Ansible
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = """
+    lookup: cached
+    version_added: "2.9"
+    short_description: memoize the results of another lookup for the run
+    description:
+        - Runs the lookup named by the first term with the remaining terms and keyword arguments,
+          and hands back the same result for the same name, terms, keyword arguments and base directory
+          for the rest of the run instead of running it again.
+        - Results are kept in an LRU in memory and, as JSON, in the run's local temporary directory, which
+          Ansible removes at exit. Workers are forked per task, so the directory is what lets later tasks
+          and other hosts reuse a result.
+        - Only meant for lookups whose result depends on nothing but their arguments and that cost more than
+          reading a small file, such as file, pipe or url. A hit outside the process that stored the result reads
+          one JSON file, which is slower than an env lookup, so env is better left uncached.
+    options:
+      _terms:
+        description: Name of the lookup to run, followed by its terms.
+        required: True
+      cache_ttl:
+        description: Seconds a result stays valid, 0 keeps it for the whole run.
+        type: float
+        default: 0
+        env:
+          - name: ANSIBLE_CACHED_LOOKUP_TTL
+      cache_size:
+        description: Maximum number of results kept, in memory the least recently used and on disk the oldest
+          ones are dropped first.
+        type: int
+        default: 1024
+        env:
+          - name: ANSIBLE_CACHED_LOOKUP_SIZE
+      cache_stats:
+        description:
+          - Return the hit and miss counters of the run instead of running a lookup.
+          - The counters are only kept when C(ANSIBLE_CACHED_LOOKUP_STATS) is set, otherwise they stay 0.
+        type: bool
+        default: False
+"""
+
+EXAMPLES = """
+- hosts: localhost
+  vars:
+    motd: "{{ lookup('cached', 'file', '/etc/motd', cache_ttl=60) }}"
+  tasks:
+    - debug:
+        msg: "{{ lookup('cached', 'pipe', 'date +%Y') }} {{ motd }}"
+
+    # ANSIBLE_CACHED_LOOKUP_STATS=1 ansible-playbook ...
+
+    - debug:
+        msg: "{{ lookup('cached', cache_stats=true) }}"
+"""
+
+from ansible import constants as C
+from ansible.errors import AnsibleError
+from ansible.module_utils._text import to_bytes
+from ansible.plugins.loader import lookup_loader
+from ansible.plugins.lookup import LookupBase
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+
+try:
+    from __main__ import display
+except ImportError:
+    from ansible.utils.display import Display
+    display = Display()
+
+# key -> (stored at, result), most recently used last
+MEMORY = OrderedDict()
+# counting costs a write per lookup, so only when asked for
+STATS = bool(os.environ.get('ANSIBLE_CACHED_LOOKUP_STATS'))
+
+
+def store_dir():
+    path = os.path.join(C.DEFAULT_LOCAL_TMP, 'cached_lookup')
+    if not os.path.isdir(path):
+        try:
+            os.makedirs(path, 0o700)
+        except OSError:
+            # another worker created it first
+            pass
+    return path
+
+
+def count(name):
+    ''' one byte appended per event, the file size is the counter, no matter how many workers add to it '''
+    if not STATS:
+        return
+    fd = os.open(os.path.join(store_dir(), name), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+    try:
+        os.write(fd, b'.')
+    finally:
+        os.close(fd)
+
+
+def counter(name):
+    try:
+        return os.path.getsize(os.path.join(store_dir(), name))
+    except OSError:
+        return 0
+
+
+def load(key, ttl):
+    ''' a hit in this process touches no file, the shared store is only read on a miss in memory '''
+    entry = MEMORY.pop(key, None)
+    if entry is None:
+        try:
+            with open(os.path.join(store_dir(), key + '.json')) as f:
+                entry = tuple(json.load(f))
+        except (IOError, OSError, ValueError):
+            return None
+    if ttl and time.time() - entry[0] > ttl:
+        return None
+    MEMORY[key] = entry
+    return entry[1]
+
+
+def save(key, result, size):
+    entry = (time.time(), result)
+    MEMORY[key] = entry
+    while len(MEMORY) > size:
+        MEMORY.popitem(last=False)
+
+    directory = store_dir()
+    try:
+        data = json.dumps(entry)
+    except (TypeError, ValueError):
+        # not representable as JSON, only this process keeps it
+        return
+    tmp = os.path.join(directory, '%s.%d.tmp' % (key, os.getpid()))
+    with os.fdopen(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w') as f:
+        f.write(data)
+    os.rename(tmp, os.path.join(directory, key + '.json'))
+
+    entries = [name for name in os.listdir(directory) if name.endswith('.json')]
+    if len(entries) > size:
+        entries.sort(key=lambda name: os.path.getmtime(os.path.join(directory, name)))
+        for name in entries[:len(entries) - size]:
+            try:
+                os.unlink(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+class LookupModule(LookupBase):
+
+    def run(self, terms, variables=None, **kwargs):
+        if kwargs.pop('cache_stats', False):
+            directory = store_dir()
+            return [{'hits': counter('hits'), 'misses': counter('misses'),
+                     'entries': len([name for name in os.listdir(directory) if name.endswith('.json')])}]
+        if not terms:
+            raise AnsibleError('cached needs the name of the lookup to run as its first term')
+
+        name, terms = terms[0], list(terms[1:])
+        ttl = float(kwargs.pop('cache_ttl', os.environ.get('ANSIBLE_CACHED_LOOKUP_TTL', 0)))
+        size = max(1, int(kwargs.pop('cache_size', os.environ.get('ANSIBLE_CACHED_LOOKUP_SIZE', 1024))))
+
+        # relative paths of file and friends resolve against the basedir, so it is part of the key
+        key = hashlib.sha1(to_bytes(json.dumps([name, terms, kwargs, self._loader.get_basedir()],
+                                               sort_keys=True, default=repr))).hexdigest()
+        result = load(key, ttl)
+        if result is not None:
+            count('hits')
+            display.vvvv('cached: hit for lookup %s %s' % (name, terms))
+            return result
+
+        lookup = lookup_loader.get(name, loader=self._loader, templar=self._templar)
+        if lookup is None:
+            raise AnsibleError("lookup plugin (%s) not found" % name)
+        result = lookup.run(terms, variables=variables, **kwargs)
+        count('misses')
+        save(key, result, size)
+        return result
@@ -9,10 +9,47 @@ DOCUMENTATION = """
     short_description: generate random string
     description:
         - This lookup returns a random string.
+        - All requested strings come from a single draw of random bytes, mapped onto the charset
+          through a translation table, so generating thousands of them in one call is cheap.
+    options:
+      _terms:
+        description: Optional prefixes, I(count) strings are generated for each of them.
+        required: False
+      length:
+        description: Length of each string, not counting the prefix, at least 1.
+        type: int
+        default: 12
+      count:
+        description: Number of strings to generate per prefix.
+        type: int
+        default: 1
+      charset:
+        description: ASCII characters the strings are made of.
+        type: str
+        default: abcdefghijklmnopqrstuvwxyz
+      seed:
+        description: Seed for a reproducible stream of strings, the same seed and options always give the same strings.
+      secure:
+        description: Draw the bytes from the operating system's cryptographically strong source. Ignored with I(seed).
+        type: bool
+        default: False
 """
+
+EXAMPLES = """
+- debug:
+    msg: "{{ lookup('randstr') }}"
+
+- set_fact:
+    host_names: "{{ query('randstr', 'host-', count=5000, length=8, seed=42) }}"
+
+- set_fact:
+    token: "{{ lookup('randstr', length=32, charset='0123456789abcdef', secure=true) }}"
+"""
+
 from ansible.errors import AnsibleError, AnsibleParserError
 from ansible.plugins.lookup import LookupBase
 
+import os
 import string
 import random
 
@@ -23,7 +60,52 @@ except ImportError:
     display = Display()
 
 
+def translation(charset):
+    ''' maps every byte onto charset, returning the table and the bytes to drop so no character is favoured '''
+    usable = 256 - 256 % len(charset)
+    table = bytearray(charset[i % len(charset)] for i in range(256))
+    return bytes(table), bytes(bytearray(range(usable, 256)))
+
+
+def random_bytes(size, rng=None, secure=False):
+    if secure and rng is None:
+        return os.urandom(size)
+    return (rng or random).getrandbits(size * 8).to_bytes(size, 'little')
+
+
 class LookupModule(LookupBase):
 
     def run(self, terms, variables=None, **kwargs):
-        return [''.join(random.choice(string.ascii_lowercase) for i in range(12))]
+        length = int(kwargs.get('length', 12))
+        count = int(kwargs.get('count', 1))
+        charset = kwargs.get('charset', string.ascii_lowercase)
+        seed = kwargs.get('seed')
+        secure = bool(kwargs.get('secure', False))
+
+        if length < 1:
+            raise AnsibleParserError('randstr length must be at least 1')
+        if count < 0:
+            raise AnsibleParserError('randstr count must not be negative')
+        try:
+            charset = bytearray(charset.encode('ascii'))
+        except UnicodeError:
+            raise AnsibleParserError('randstr charset must only contain ASCII characters')
+        if not charset:
+            raise AnsibleParserError('randstr charset must not be empty')
+
+        prefixes = terms or ['']
+        needed = length * count * len(prefixes)
+        rng = random.Random(seed) if seed is not None else None
+        table, biased = translation(charset)
+
+        chars = b''
+        while len(chars) < needed:
+            # dropped bytes only occur when 256 is not a multiple of the charset size, so a few extra draws suffice
+            chars += random_bytes(needed - len(chars) + len(biased), rng, secure).translate(table, biased)
+        chars = chars[:needed].decode('ascii')
+
+        ret = []
+        for offset, prefix in enumerate(prefixes):
+            start = offset * length * count
+            ret.extend(prefix + chars[i:i + length] for i in range(start, start + length * count, length))
+        return ret
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+from argparse import ArgumentParser
+import os
+import sys
+import timeit
+
+from ansible.plugins.loader import become_loader, shell_loader
+
+# Times custom_plugin's build_become_command, the part of become that runs
+# on the controller for every task and host.
+#
+# "cached" is the normal case, the prefix for an option set is compiled once
+# and reused.  "compile" empties the prefix cache before every call, which is
+# what every call cost before the cache existed.  Calls cycle through
+# --option-sets distinct become users, with and without a password, and
+# every number is the fastest of --repeat measurements.
+#
+#   python utils/benchmark_become.py --calls 100000 --option-sets 50
+
+here = os.path.dirname(os.path.abspath(__file__))
+repo = os.path.dirname(here)
+
+
+def load_plugin():
+    become_loader.add_directory(os.path.join(repo, 'become_plugins'))
+    plugin = become_loader.get('custom_plugin')
+    return plugin, sys.modules[type(plugin).__module__].PREFIXES
+
+
+def option_sets(count, password):
+    return [{'become_user': 'user_%d' % i, 'become_pass': password} for i in range(count)]
+
+
+def measure(plugin, prefixes, options, calls, repeat, clear):
+    shell = shell_loader.get('sh')
+    prefixes.clear()
+
+    def call(i):
+        if clear:
+            prefixes.clear()
+        plugin.set_options(direct=options[i % len(options)])
+        plugin.build_become_command('/usr/bin/python /tmp/AnsiballZ_command.py', shell)
+
+    # set_options is timed on its own and taken out, the executor calls it either way
+    baseline = min(timeit.repeat(lambda: [plugin.set_options(direct=options[i % len(options)])
+                                          for i in range(calls)], number=1, repeat=repeat))
+    total = min(timeit.repeat(lambda: [call(i) for i in range(calls)], number=1, repeat=repeat))
+    return (total - baseline) / calls
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('--calls', type=int, default=100000, help='Calls per measurement (default: 100000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Measurements to take the fastest of (default: 5)')
+    parser.add_argument('--option-sets', type=int, default=10, help='Distinct become users (default: 10)')
+    args = parser.parse_args()
+
+    plugin, prefixes = load_plugin()
+    for password in (None, 'secret'):
+        options = option_sets(args.option_sets, password)
+        results = dict((name, measure(plugin, prefixes, options, args.calls, args.repeat, clear))
+                       for name, clear in (('compile', True), ('cached', False)))
+        print('{:<12} compile {:8.2f}us  cached {:8.2f}us  saved {:6.1%}'.format(
+            'password' if password else 'no password', results['compile'] * 1e6, results['cached'] * 1e6,
+            1 - results['cached'] / results['compile'] if results['compile'] > 0 else 0.0))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+from argparse import ArgumentParser
+import json
+import os
+import shutil
+import tempfile
+
+from benchmark_playbooks import repo, run_playbook, summarize, write_inventory
+
+# Compares fact cache plugins with fact_cache_benchmark.yml.
+#
+# For every --hosts count and every plugin, the playbook first stores a
+# scan_payload fact of --scan-size characters per host in an empty cache
+# (tag write), then reads it back --repeat times from fresh ansible-playbook
+# runs (tag read).  The wall time, CPU time and peak RSS of every pass are
+# printed along with the size of the cache on disk.
+#
+#   python utils/benchmark_fact_cache.py --hosts 1000 10000 --forks 50 --save fact_cache.json
+
+PLAYBOOK = 'fact_cache_benchmark.yml'
+PLUGINS = ['jsonfile', 'sqlite']
+
+
+def disk_usage(path):
+    total = 0
+    for root, dirs, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def run_pass(tag, inventory, args, repeat):
+    extra_args = ['-t', tag, '-e', 'scan_size={}'.format(args.scan_size)] + args.extra_args
+    runs = [run_playbook(PLAYBOOK, inventory, args.forks, args.executable, extra_args) for i in range(repeat)]
+    return {'runs': runs, 'summary': summarize(runs)}
+
+
+def benchmark(args):
+    results = {}
+    for hosts in args.hosts:
+        directory = tempfile.mkdtemp(prefix='benchmark_fact_cache')
+        try:
+            inventory = write_inventory(directory, hosts)
+            for plugin in args.plugins:
+                cache = os.path.join(directory, plugin)
+                os.mkdir(cache)
+                os.environ.update({'ANSIBLE_CACHE_PLUGINS': os.path.join(repo, 'cache_plugins'),
+                                   'ANSIBLE_CACHE_PLUGIN': plugin,
+                                   'ANSIBLE_CACHE_PLUGIN_CONNECTION': cache})
+                result = {'write': run_pass('write', inventory, args, 1),
+                          'read': run_pass('read', inventory, args, args.repeat),
+                          'disk_bytes': disk_usage(cache)}
+                results.setdefault(str(hosts), {})[plugin] = result
+                for phase in ('write', 'read'):
+                    summary = result[phase]['summary']
+                    print('{:>6} hosts {:<10} {:<6} wall {:8.3f}s  cpu {:8.3f}s  rss {:>8.0f}KB  disk {:>12d}B'.format(
+                        hosts, plugin, phase, summary['wall']['median'], summary['cpu']['median'],
+                        summary['max_rss_kb']['median'], result['disk_bytes']))
+        finally:
+            shutil.rmtree(directory)
+    return {'forks': args.forks, 'scan_size': args.scan_size, 'repeat': args.repeat, 'results': results}
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument('--hosts', type=int, nargs='+', default=[1000, 10000],
+                        help='Numbers of local hosts to run with (default: 1000 10000)')
+    parser.add_argument('--plugins', nargs='+', default=PLUGINS,
+                        help='Cache plugins to compare (default: {})'.format(' '.join(PLUGINS)))
+    parser.add_argument('--scan-size', type=int, default=16384,
+                        help='Characters in the strings of each host\'s scan_payload fact (default: 16384)')
+    parser.add_argument('--forks', type=int, default=50, help='Forks passed to ansible-playbook (default: 50)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed read passes per plugin (default: 3)')
+    parser.add_argument('--save', metavar='PATH', help='Write the results to this JSON file')
+    parser.add_argument('--executable', default='ansible-playbook', help='ansible-playbook to run')
+    parser.add_argument('--extra-arg', dest='extra_args', action='append', default=[],
+                        help='Extra argument passed to every ansible-playbook run, can be repeated')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = benchmark(args)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
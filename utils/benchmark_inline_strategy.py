@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+from argparse import ArgumentParser
+import json
+import os
+import shutil
+import tempfile
+
+from benchmark_playbooks import repo, run_playbook, summarize, write_inventory
+
+# Compares the inline strategy (strategy_plugins/inline.py) with the linear
+# and free strategies it falls back to, over the playbooks made of controller
+# only tasks.  Every playbook runs --repeat times per strategy against
+# --hosts local hosts, the median wall and CPU time are printed next to how
+# much faster inline was than its base.  nested_debug.yml starts a nested
+# ansible-playbook, which runs with the same strategy.
+#
+#   python utils/benchmark_inline_strategy.py --hosts 50 --forks 10
+#   python utils/benchmark_inline_strategy.py setfact_50.yml --hosts 500 --repeat 5
+
+PLAYBOOKS = ['setfact_50.yml', 'debug-50.yml', 'nested_debug.yml']
+# name, base strategy to compare against, environment
+STRATEGIES = [
+    ('linear', None, {'ANSIBLE_STRATEGY': 'linear'}),
+    ('inline', 'linear', {'ANSIBLE_STRATEGY': 'inline', 'ANSIBLE_INLINE_STRATEGY_BASE': 'linear'}),
+    ('free', None, {'ANSIBLE_STRATEGY': 'free'}),
+    ('inline-free', 'free', {'ANSIBLE_STRATEGY': 'inline', 'ANSIBLE_INLINE_STRATEGY_BASE': 'free'}),
+]
+
+
+def benchmark(args):
+    directory = tempfile.mkdtemp(prefix='benchmark_inline_strategy')
+    results = {}
+    try:
+        inventory = write_inventory(directory, args.hosts)
+        os.environ['ANSIBLE_STRATEGY_PLUGINS'] = os.path.join(repo, 'strategy_plugins')
+        for playbook in args.playbooks:
+            results[playbook] = {}
+            for name, base, environment in STRATEGIES:
+                os.environ.update(environment)
+                runs = [run_playbook(playbook, inventory, args.forks, args.executable, args.extra_args)
+                        for i in range(args.repeat)]
+                summary = summarize(runs)
+                results[playbook][name] = {'runs': runs, 'summary': summary}
+                speedup = ''
+                if base:
+                    before = results[playbook][base]['summary']['wall']['median']
+                    speedup = '  {:+7.1%} vs {}'.format((before - summary['wall']['median']) / before, base)
+                print('{:<20} {:<12} wall {:8.3f}s  cpu {:8.3f}s{}'.format(
+                    playbook, name, summary['wall']['median'], summary['cpu']['median'], speedup))
+    finally:
+        shutil.rmtree(directory)
+    return {'hosts': args.hosts, 'forks': args.forks, 'repeat': args.repeat, 'playbooks': results}
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument('playbooks', nargs='*', default=PLAYBOOKS,
+                        help='Playbooks to run, relative to the repository root (default: {})'.format(
+                            ' '.join(PLAYBOOKS)))
+    parser.add_argument('--hosts', type=int, default=20, help='Number of local hosts in the inventory (default: 20)')
+    parser.add_argument('--forks', type=int, default=5, help='Forks passed to ansible-playbook (default: 5)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per playbook and strategy (default: 3)')
+    parser.add_argument('--save', metavar='PATH', help='Write the results to this JSON file')
+    parser.add_argument('--executable', default='ansible-playbook', help='ansible-playbook to run')
+    parser.add_argument('--extra-arg', dest='extra_args', action='append', default=[],
+                        help='Extra argument passed to every ansible-playbook run, can be repeated')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = benchmark(args)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+from argparse import ArgumentParser
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Runs some of the playbooks in this repository as controller benchmarks.
+#
+# Every playbook runs against a generated inventory of --hosts local hosts,
+# first --warmup times untimed and then --repeat times timed.  For each timed
+# run the wall time, the CPU time and the peak RSS of ansible-playbook and its
+# workers are recorded.  --save writes the results as a JSON baseline, and
+# --baseline compares a run against one, exiting with 1 when a playbook's
+# median got slower or bigger by more than --threshold.
+#
+#   python utils/benchmark_playbooks.py --hosts 20 --forks 10 --save baseline.json
+#   python utils/benchmark_playbooks.py --hosts 20 --forks 10 --baseline baseline.json
+
+here = os.path.dirname(os.path.abspath(__file__))
+repo = os.path.dirname(here)
+
+PLAYBOOKS = ['file_benchmark.yml', 'debug-50.yml', 'setfact_50.yml', 'ping-20.yml', 'free_waiter.yml']
+METRICS = ('wall', 'cpu', 'max_rss_kb')
+
+
+def write_inventory(directory, hosts):
+    path = os.path.join(directory, 'benchmark_inventory.ini')
+    with open(path, 'w') as f:
+        f.write('[benchmark]\n')
+        f.write('benchmark_host_[{0:0{1}d}:{2}]\n'.format(1, len(str(hosts)), hosts) if hosts > 1 else
+                'benchmark_host_1\n')
+        f.write('\n[all:vars]\nansible_connection=local\nansible_python_interpreter={}\n'.format(sys.executable))
+    return path
+
+
+def run_playbook(playbook, inventory, forks, executable, extra_args):
+    ''' runs one playbook and returns its wall time, CPU time and peak RSS including all workers '''
+    command = [executable, '-i', inventory, '-f', str(forks), playbook] + extra_args
+    with open(os.devnull, 'w') as devnull, tempfile.TemporaryFile() as stderr:
+        start = time.time()
+        proc = subprocess.Popen(command, cwd=repo, stdout=devnull, stderr=stderr)
+        # wait4 instead of wait, for the resource usage of this run alone
+        _, status, usage = os.wait4(proc.pid, 0)
+        wall = time.time() - start
+        # the same returncode Popen.wait would set, os.waitstatus_to_exitcode needs Python 3.9
+        proc.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+        if proc.returncode != 0:
+            stderr.seek(0)
+            raise RuntimeError('{} failed with rc={}: {}'.format(' '.join(command), proc.returncode,
+                                                                stderr.read().decode('utf-8', 'replace').strip()))
+    return {'wall': wall, 'cpu': usage.ru_utime + usage.ru_stime, 'max_rss_kb': usage.ru_maxrss}
+
+
+def summarize(runs):
+    summary = {}
+    for metric in METRICS:
+        values = [run[metric] for run in runs]
+        summary[metric] = {'median': statistics.median(values), 'min': min(values), 'max': max(values),
+                           'stdev': statistics.stdev(values) if len(values) > 1 else 0.0}
+    return summary
+
+
+def benchmark(args):
+    directory = tempfile.mkdtemp(prefix='benchmark_playbooks')
+    try:
+        inventory = write_inventory(directory, args.hosts)
+        results = {}
+        for playbook in args.playbooks:
+            for i in range(args.warmup):
+                run_playbook(playbook, inventory, args.forks, args.executable, args.extra_args)
+            runs = [run_playbook(playbook, inventory, args.forks, args.executable, args.extra_args)
+                    for i in range(args.repeat)]
+            # derived from the arguments, ansible-playbook never starts more workers than there are hosts,
+            # how many actually run at once is not measured
+            results[playbook] = {'runs': runs, 'summary': summarize(runs),
+                                 'forks_configured': min(args.forks, args.hosts)}
+            print('{:<24} wall {:8.3f}s  cpu {:8.3f}s  rss {:>8.0f}KB  forks {} (configured)'.format(
+                playbook, results[playbook]['summary']['wall']['median'],
+                results[playbook]['summary']['cpu']['median'],
+                results[playbook]['summary']['max_rss_kb']['median'],
+                results[playbook]['forks_configured']))
+    finally:
+        shutil.rmtree(directory)
+    return {'hosts': args.hosts, 'forks': args.forks, 'warmup': args.warmup, 'repeat': args.repeat,
+            'python': platform.python_version(), 'node': platform.node(), 'time': time.time(),
+            'playbooks': results}
+
+
+def compare(current, baseline, threshold):
+    ''' returns a description of every median that got worse than the baseline by more than threshold '''
+    regressions = []
+    if (current['hosts'], current['forks']) != (baseline['hosts'], baseline['forks']):
+        print('warning: baseline ran with {} hosts and {} forks'.format(baseline['hosts'], baseline['forks']))
+    for playbook, result in sorted(current['playbooks'].items()):
+        if playbook not in baseline['playbooks']:
+            print('{:<24} not in baseline'.format(playbook))
+            continue
+        for metric in METRICS:
+            now = result['summary'][metric]['median']
+            before = baseline['playbooks'][playbook]['summary'][metric]['median']
+            change = (now - before) / before if before else 0.0
+            regressed = change > threshold
+            print('{:<24} {:<10} {:12.3f} -> {:12.3f}  {:+7.1%}{}'.format(
+                playbook, metric, before, now, change, '  REGRESSION' if regressed else ''))
+            if regressed:
+                regressions.append('{} {} {:+.1%}'.format(playbook, metric, change))
+    return regressions
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument('playbooks', nargs='*', default=PLAYBOOKS,
+                        help='Playbooks to run, relative to the repository root (default: {})'.format(
+                            ' '.join(PLAYBOOKS)))
+    parser.add_argument('--hosts', type=int, default=10, help='Number of local hosts in the inventory (default: 10)')
+    parser.add_argument('--forks', type=int, default=5, help='Forks passed to ansible-playbook (default: 5)')
+    parser.add_argument('--warmup', type=int, default=1, help='Untimed runs per playbook (default: 1)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per playbook (default: 3)')
+    parser.add_argument('--save', metavar='PATH', help='Write the results to this JSON file')
+    parser.add_argument('--baseline', metavar='PATH', help='Compare the results against this JSON file')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Fraction a median may grow by before it counts as a regression (default: 0.10)')
+    parser.add_argument('--executable', default='ansible-playbook', help='ansible-playbook to run')
+    parser.add_argument('--extra-arg', dest='extra_args', action='append', default=[],
+                        help='Extra argument passed to every ansible-playbook run, can be repeated')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = benchmark(args)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print('regressions: {}'.format(', '.join(regressions)))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,761 @@
+#!/usr/bin/env python
+from argparse import ArgumentParser
+import asyncio
+import base64
+import itertools
+import json
+import os
+import random
+import signal
+import ssl
+import statistics
+import sys
+import time
+from collections import defaultdict
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# A local stand-in for the Tower/AWX REST API, so the suites in tower_modules/
+# can run without a Tower and be scaled up to measure how many requests the
+# modules make and how well they reuse connections.
+#
+# Every /api/v2/<collection>/ behaves like an AWX list endpoint with
+# filtering, paging, create, read, update and delete, and
+# /api/v2/<collection>/<id>/<related>/ lists, associates and disassociates
+# related objects.  On top of that it implements the endpoints the task files
+# rely on: job and workflow launch, cancel and relaunch, project and
+# inventory source updates, object roles, settings, ping, config and me.
+# State is kept in memory and starts out with the Default organization, the
+# admin user and the Demo inventory, credential, project and job template.
+# Launched jobs go from pending to running to successful over --job-pending
+# and --job-duration seconds.  Any credentials are accepted.
+#
+# Every response is delayed by --latency seconds (plus up to --jitter), or by
+# what --endpoint-latency sets for a single endpoint.  Request counts and
+# latencies are kept per endpoint, with ids replaced by {id}, together with
+# how many requests every connection carried.  They are served as JSON from
+# /_standin/stats, cleared by POST /_standin/reset, and printed, and written
+# to --stats-file, when the server stops.
+#
+#   python utils/tower_standin.py --port 8013 --latency 0.01 --stats-file tower_stats.json &
+#   TOWER_HOST=http://127.0.0.1:8013 TOWER_USERNAME=admin TOWER_PASSWORD=password \
+#       ansible-playbook tower_modules/main.yml
+#
+# --certfile and --keyfile serve HTTPS instead, which the SSL checks in
+# tower_common need.
+
+API = '/api/v2/'
+PAGE_SIZE = 25
+MAX_PAGE_SIZE = 200
+
+# child collections that refer to their parent by this field, for uniqueness and cascading deletes
+SCOPES = {'hosts': 'inventory', 'groups': 'inventory', 'inventory_sources': 'inventory'}
+UNSCOPED = ('organizations', 'users', 'credential_types', 'instance_groups', 'settings')
+CASCADES = {'inventories': ('hosts', 'groups', 'inventory_sources'),
+            'job_templates': ('schedules',),
+            'workflow_job_templates': ('workflow_job_template_nodes',)}
+
+ROLES = {
+    'organizations': ('admin', 'execute', 'project_admin', 'inventory_admin', 'credential_admin',
+                      'workflow_admin', 'notification_admin', 'job_template_admin', 'auditor', 'member', 'read'),
+    'teams': ('admin', 'member', 'read'),
+    'projects': ('admin', 'use', 'update', 'read'),
+    'inventories': ('admin', 'update', 'adhoc', 'use', 'read'),
+    'credentials': ('admin', 'use', 'read'),
+    'job_templates': ('admin', 'execute', 'read'),
+    'workflow_job_templates': ('admin', 'execute', 'read', 'approval'),
+}
+
+# related lists whose members live in another collection, the rest are named after theirs
+RELATED = {
+    'object_roles': 'roles', 'children': 'groups', 'all_hosts': 'hosts', 'admins': 'users', 'members': 'users',
+    'access_list': 'users', 'extra_credentials': 'credentials', 'nodes': 'workflow_job_template_nodes',
+    'workflow_nodes': 'workflow_job_template_nodes', 'success_nodes': 'workflow_job_template_nodes',
+    'failure_nodes': 'workflow_job_template_nodes', 'always_nodes': 'workflow_job_template_nodes',
+    'notification_templates_started': 'notification_templates',
+    'notification_templates_success': 'notification_templates',
+    'notification_templates_error': 'notification_templates',
+    'notification_templates_approvals': 'notification_templates',
+}
+# associations that are visible from both ends, (member collection, owner collection) -> related list of the member
+REVERSE = {('roles', 'users'): 'users', ('roles', 'teams'): 'teams', ('users', 'roles'): 'roles',
+           ('teams', 'roles'): 'roles', ('hosts', 'groups'): 'groups', ('groups', 'hosts'): 'hosts'}
+
+# launchable templates, what they create and the action that does it
+LAUNCH = {'job_templates': ('jobs', 'launch'), 'workflow_job_templates': ('workflow_jobs', 'launch'),
+          'projects': ('project_updates', 'update'), 'inventory_sources': ('inventory_updates', 'update'),
+          'system_job_templates': ('system_jobs', 'launch')}
+LAUNCH_BY_JOBS = dict((jobs, template) for template, (jobs, action) in LAUNCH.items())
+UNIFIED_JOBS = ('jobs', 'workflow_jobs', 'project_updates', 'inventory_updates', 'system_jobs', 'ad_hoc_commands')
+FINISHED = ('successful', 'failed', 'error', 'canceled')
+
+CREDENTIAL_TYPES = [
+    ('Machine', 'ssh', 'ssh'), ('Source Control', 'scm', 'scm'), ('Vault', 'vault', 'vault'),
+    ('Network', 'net', 'net'), ('Amazon Web Services', 'cloud', 'aws'), ('OpenStack', 'cloud', 'openstack'),
+    ('VMware vCenter', 'cloud', 'vmware'), ('Red Hat Satellite 6', 'cloud', 'satellite6'),
+    ('Red Hat CloudForms', 'cloud', 'cloudforms'), ('Google Compute Engine', 'cloud', 'gce'),
+    ('Microsoft Azure Resource Manager', 'cloud', 'azure_rm'), ('Red Hat Virtualization', 'cloud', 'rhv'),
+    ('Insights', 'insights', 'insights'), ('Ansible Tower', 'cloud', 'tower'),
+    ('OpenShift or Kubernetes API Bearer Token', 'kubernetes', 'kubernetes_bearer_token'),
+]
+
+SETTINGS = {
+    'AWX_PROOT_ENABLED': True,
+    'AWX_PROOT_BASE_PATH': '/tmp',
+    'AWX_PROOT_SHOW_PATHS': [],
+    'AWX_PROOT_HIDE_PATHS': [],
+    'AWX_TASK_ENV': {},
+    'AD_HOC_COMMANDS': ['command', 'shell', 'yum', 'apt', 'service', 'ping'],
+    'ALLOW_JINJA_IN_EXTRA_VARS': 'template',
+    'PROJECT_UPDATE_VVV': False,
+    'SCHEDULE_MAX_JOBS': 10,
+    'TOWER_URL_BASE': 'https://towerhost',
+    'AUTH_BASIC_ENABLED': True,
+}
+SETTING_CATEGORIES = ('all', 'authentication', 'changed', 'jobs', 'system', 'ui', 'logging', 'named-url')
+
+REASONS = {200: 'OK', 201: 'Created', 202: 'Accepted', 204: 'No Content', 400: 'Bad Request', 403: 'Forbidden',
+           404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+class HTTPError(Exception):
+
+    def __init__(self, status, body):
+        super(HTTPError, self).__init__(status)
+        self.status = status
+        self.body = body
+
+
+def not_found():
+    return HTTPError(404, {'detail': 'Not found.'})
+
+
+def singular(collection):
+    if collection.endswith('ies'):
+        return collection[:-3] + 'y'
+    return collection[:-1] if collection.endswith('s') else collection
+
+
+def plural(field):
+    if field.endswith('y'):
+        return field[:-1] + 'ies'
+    return field + 's'
+
+
+def timestamp(when):
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(when)) + '.%06dZ' % int((when % 1) * 1000000)
+
+
+def name_field(collection):
+    return 'username' if collection == 'users' else 'name'
+
+
+def loads_vars(value):
+    ''' extra_vars as a dict, whether they came as a dict or as a JSON string '''
+    if isinstance(value, dict):
+        return value
+    try:
+        parsed = json.loads(value) if value else {}
+    except ValueError:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+class Store(object):
+    ''' all objects in memory, each collection maps ids to plain dicts '''
+
+    def __init__(self, job_pending, job_duration):
+        self.job_pending = job_pending
+        self.job_duration = job_duration
+        self.collections = defaultdict(dict)
+        self.ids = defaultdict(lambda: itertools.count(1))
+        # (collection, id) -> related -> ids in the related collection, in association order
+        self.associations = defaultdict(lambda: defaultdict(dict))
+        self.settings = dict(SETTINGS)
+        self.seed()
+
+    def seed(self):
+        org = self.create('organizations', {'name': 'Default', 'description': ''})
+        self.create('users', {'username': 'admin', 'email': 'admin@example.com', 'is_superuser': True,
+                              'first_name': '', 'last_name': ''})
+        self.create('instance_groups', {'name': 'tower', 'capacity': 100})
+        for name, kind, namespace in CREDENTIAL_TYPES:
+            self.create('credential_types', {'name': name, 'kind': kind, 'namespace': namespace,
+                                             'managed_by_tower': True, 'inputs': {}, 'injectors': {}})
+        credential = self.create('credentials', {'name': 'Demo Credential', 'credential_type': 1,
+                                                 'organization': None, 'inputs': {'username': 'admin'}})
+        inventory = self.create('inventories', {'name': 'Demo Inventory', 'organization': org['id'], 'kind': '',
+                                                'variables': ''})
+        self.create('hosts', {'name': 'localhost', 'inventory': inventory['id'], 'enabled': True, 'variables': ''})
+        project = self.create('projects', {'name': 'Demo Project', 'organization': org['id'], 'scm_type': 'git',
+                                           'scm_url': 'https://github.com/ansible/ansible-tower-samples'})
+        template = self.create('job_templates', {'name': 'Demo Job Template', 'inventory': inventory['id'],
+                                                 'project': project['id'], 'playbook': 'hello_world.yml',
+                                                 'job_type': 'run'})
+        self.associate('job_templates', template['id'], 'credentials', credential['id'])
+
+    def get(self, collection, id):
+        try:
+            return self.collections[collection][int(id)]
+        except (KeyError, ValueError):
+            raise not_found()
+
+    def check_unique(self, collection, data, id=None):
+        field = name_field(collection)
+        if collection not in UNSCOPED and collection not in SCOPES and 'organization' not in data:
+            return
+        if data.get(field) is None or collection in UNIFIED_JOBS or collection == 'roles':
+            return
+        scope = None if collection in UNSCOPED else SCOPES.get(collection, 'organization')
+        for other in self.collections[collection].values():
+            if other['id'] != id and other.get(field) == data[field] and (
+                    scope is None or other.get(scope) == data.get(scope)):
+                message = '%s with this Name%s already exists.' % (
+                    singular(collection).replace('_', ' ').capitalize(),
+                    ' and %s' % scope.capitalize() if scope else '')
+                raise HTTPError(400, {'__all__' if scope else field: [message]})
+
+    def create(self, collection, data):
+        field = name_field(collection)
+        if collection not in UNIFIED_JOBS and collection != 'roles' and not data.get(field) and (
+                collection in UNSCOPED or collection in SCOPES or collection in ROLES):
+            raise HTTPError(400, {field: ['This field is required.']})
+        self.check_unique(collection, data)
+        now = time.time()
+        obj = dict(data)
+        obj.update({'id': next(self.ids[collection]), 'type': singular(collection), '_created': now})
+        obj.setdefault('description', '')
+        if collection == 'tokens':
+            obj['token'] = base64.b16encode(os.urandom(15)).decode('ascii').lower()
+        self.collections[collection][obj['id']] = obj
+        for role in ROLES.get(collection, ()):
+            role = self.create('roles', {'name': role.replace('_', ' ').title(), 'role_field': role + '_role',
+                                         'description': 'Can %s the %s' % (role, obj['type']),
+                                         'resource_type': obj['type'], 'resource_id': obj['id'],
+                                         'resource_name': obj.get(field)})
+            self.associate(collection, obj['id'], 'object_roles', role['id'])
+        if collection == 'projects' and obj.get('scm_type'):
+            self.launch('projects', obj, {})
+        return obj
+
+    def update(self, collection, obj, data, replace=False):
+        if collection == 'settings':
+            return self.update_settings(data)
+        merged = {} if replace else dict(obj)
+        merged.update(data)
+        self.check_unique(collection, merged, obj['id'])
+        for key in ('id', 'type', '_created'):
+            merged[key] = obj[key]
+        obj.clear()
+        obj.update(merged)
+        return obj
+
+    def update_settings(self, data):
+        for key, value in data.items():
+            current = self.settings.get(key)
+            if isinstance(current, list) and not isinstance(value, list):
+                try:
+                    value = json.loads(value) if isinstance(value, str) else value
+                except ValueError:
+                    pass
+                if not isinstance(value, list):
+                    raise HTTPError(400, {key: ['Expected a list of items but got type "%s".'
+                                                % type(value).__name__]})
+            elif isinstance(current, bool) and not isinstance(value, bool):
+                raise HTTPError(400, {key: ['Must be a valid boolean.']})
+            data[key] = value
+        self.settings.update(data)
+        return self.settings
+
+    def delete(self, collection, id):
+        obj = self.collections[collection].pop(int(id), None)
+        if obj is None:
+            raise not_found()
+        for child in CASCADES.get(collection, ()):
+            field = SCOPES.get(child, singular(collection))
+            for other in [o for o in self.collections[child].values() if o.get(field) == obj['id']]:
+                self.delete(child, other['id'])
+        related = self.associations.pop((collection, obj['id']), {})
+        for role in related.get('object_roles', ()):
+            self.collections['roles'].pop(role, None)
+
+    def associate(self, collection, id, related, target):
+        self.associations[(collection, id)][related][target] = True
+        target_collection = RELATED.get(related, related)
+        reverse = REVERSE.get((target_collection, collection))
+        if reverse:
+            self.associations[(target_collection, target)][reverse][id] = True
+
+    def disassociate(self, collection, id, related, target):
+        self.associations[(collection, id)][related].pop(target, None)
+        target_collection = RELATED.get(related, related)
+        reverse = REVERSE.get((target_collection, collection))
+        if reverse:
+            self.associations[(target_collection, target)][reverse].pop(id, None)
+
+    def related(self, collection, id, related):
+        target = RELATED.get(related, related)
+        members = self.associations[(collection, id)].get(related, {}) if (collection, id) in self.associations else {}
+        return target, [self.collections[target][i] for i in members if i in self.collections[target]]
+
+    def field(self, collection, obj, name):
+        ''' a field as the API shows it, job state is worked out when it is read '''
+        if collection in UNIFIED_JOBS and name in ('status', 'failed'):
+            status = self.job_status(obj)
+            return status if name == 'status' else status in ('failed', 'error')
+        return obj.get(name)
+
+    def launch(self, collection, template, data):
+        jobs, action = LAUNCH[collection]
+        credentials = [int(c) for c in ([data['credential']] if data.get('credential') else [])
+                       + list(data.get('credentials') or ())]
+        extra_vars = dict(loads_vars(template.get('extra_vars')), **loads_vars(data.get('extra_vars')))
+        job = {'name': template.get('name'), 'unified_job_template': template['id'], 'launch_type': 'manual',
+               singular(collection): template['id'], 'extra_vars': json.dumps(extra_vars),
+               'job_explanation': '', 'result_stdout': ''}
+        for field in ('inventory', 'project', 'playbook', 'job_type', 'limit', 'verbosity', 'job_tags',
+                      'skip_tags', 'scm_branch', 'organization'):
+            if field in template or field in data:
+                job[field] = data.get(field, template.get(field))
+        if collection == 'projects':
+            job.update({'project': template['id'], 'scm_type': template.get('scm_type'), 'job_type': 'check'})
+            # updates of the seeded and created projects finish right away, so they are usable at once
+            job['_instant'] = True
+        job = self.create(jobs, job)
+        for credential in credentials:
+            self.associate(jobs, job['id'], 'credentials', credential)
+        template['last_job'] = job['id']
+        return jobs, job
+
+    def job_status(self, job):
+        if job.get('_status') in FINISHED:
+            return job['_status']
+        if job.get('_instant'):
+            return 'successful'
+        age = time.time() - job['_created']
+        if age < self.job_pending:
+            return 'pending'
+        if age < self.job_pending + self.job_duration:
+            return 'running'
+        return 'successful'
+
+    def cancel(self, job):
+        if self.job_status(job) in FINISHED:
+            raise HTTPError(405, {'error': 'Job is not running and cannot be canceled.'})
+        job['_status'] = 'canceled'
+        job['_finished'] = time.time()
+
+    def render(self, collection, obj):
+        ''' the API representation of an object, with urls, summary fields and job state filled in '''
+        if collection == 'settings':
+            return obj
+        out = dict((k, v) for k, v in obj.items() if not k.startswith('_'))
+        url = '%s%s/%d/' % (API, collection, obj['id'])
+        out['url'] = url
+        out['created'] = out['modified'] = timestamp(obj['_created'])
+        related = {}
+        summary = {}
+        for field, value in obj.items():
+            target = plural(field)
+            if isinstance(value, int) and not isinstance(value, bool) and target in self.collections \
+                    and field not in ('id',):
+                related[field] = '%s%s/%d/' % (API, target, value)
+                other = self.collections[target].get(value)
+                if other is not None:
+                    summary[field] = {'id': value, 'name': other.get(name_field(target)),
+                                      'description': other.get('description', '')}
+        for rel, members in self.associations.get((collection, obj['id']), {}).items():
+            related[rel] = '%s%s/' % (url, rel)
+            if rel == 'credentials':
+                summary['credentials'] = [{'id': m, 'name': self.collections['credentials'][m]['name']}
+                                          for m in members if m in self.collections['credentials']]
+        if collection in ROLES:
+            summary['object_roles'] = dict(
+                (role['role_field'], {'id': role['id'], 'name': role['name'], 'description': role['description']})
+                for role in self.related(collection, obj['id'], 'object_roles')[1])
+        if collection == 'roles':
+            summary.update({'resource_name': obj.get('resource_name'), 'resource_type': obj.get('resource_type'),
+                            'resource_id': obj.get('resource_id')})
+        if collection in LAUNCH and obj.get('last_job'):
+            jobs = LAUNCH[collection][0]
+            last = self.collections[jobs].get(obj['last_job'])
+            if last is not None:
+                status = self.job_status(last)
+                summary['last_job'] = summary['last_update'] = {'id': last['id'], 'status': status,
+                                                                'failed': status in ('failed', 'error')}
+                out['status'] = status
+                if collection == 'projects':
+                    related['last_update'] = '%s%s/%d/' % (API, jobs, last['id'])
+        if collection in UNIFIED_JOBS:
+            status = self.job_status(obj)
+            started = obj['_created'] + self.job_pending if status != 'pending' else None
+            finished = obj.get('_finished') or (
+                started + self.job_duration if started and status in FINISHED and not obj.get('_instant') else None)
+            if obj.get('_instant'):
+                started = finished = obj['_created']
+            out.update({'status': status, 'failed': status in ('failed', 'error'),
+                        'started': timestamp(started) if started else None,
+                        'finished': timestamp(finished) if finished else None,
+                        'elapsed': round((finished or time.time()) - started, 3) if started else 0.0})
+            for action in ('cancel', 'relaunch', 'stdout', 'job_events'):
+                related[action] = '%s%s/' % (url, action)
+        if collection in LAUNCH:
+            related[LAUNCH[collection][1]] = '%s%s/' % (url, LAUNCH[collection][1])
+        out['related'] = related
+        out['summary_fields'] = summary
+        return out
+
+
+def matches(store, collection, obj, filters):
+    for key, value in filters:
+        field, _, lookup = key.partition('__')
+        have = store.field(collection or plural(obj['type']), obj, field)
+        if lookup == 'in':
+            if str(have) not in value.split(','):
+                return False
+        elif lookup == 'icontains':
+            if value.lower() not in str(have or '').lower():
+                return False
+        elif lookup == 'isnull':
+            if (have is None) != (value.lower() in ('true', '1')):
+                return False
+        elif lookup in ('', 'exact', 'iexact'):
+            if isinstance(have, bool):
+                if have != (value.lower() in ('true', '1')):
+                    return False
+            elif have is None:
+                if value.lower() not in ('', 'null', 'none'):
+                    return False
+            elif (str(have).lower() if lookup == 'iexact' else str(have)) != (
+                    value.lower() if lookup == 'iexact' else value):
+                return False
+    return True
+
+
+class Standin(object):
+    ''' routes API requests to the store and keeps the request statistics '''
+
+    def __init__(self, args):
+        self.args = args
+        self.store = Store(args.job_pending, args.job_duration)
+        self.endpoint_latency = dict(spec.rsplit('=', 1) for spec in args.endpoint_latency)
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.started = time.time()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.connections = 0
+        self.per_connection = []
+
+    def stats(self):
+        endpoints = {}
+        for endpoint, samples in sorted(self.latencies.items()):
+            ordered = sorted(samples)
+            endpoints[endpoint] = {
+                'count': len(ordered), 'total': sum(ordered), 'mean': statistics.mean(ordered),
+                'p50': ordered[len(ordered) // 2], 'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                'max': ordered[-1], 'statuses': dict(self.statuses[endpoint])}
+        requests = sum(len(samples) for samples in self.latencies.values())
+        finished = list(self.per_connection)
+        return {'elapsed': time.time() - self.started, 'requests': requests, 'connections': self.connections,
+                'requests_per_connection': requests / float(self.connections) if self.connections else 0.0,
+                'max_requests_per_connection': max(finished) if finished else 0,
+                'endpoints': endpoints}
+
+    def delay(self, endpoint):
+        if endpoint in self.endpoint_latency:
+            return float(self.endpoint_latency[endpoint])
+        return self.args.latency + (random.random() * self.args.jitter if self.args.jitter else 0.0)
+
+    def page(self, request, collection, objects):
+        query = request['query']
+        filters = [(k, v) for k, v in query if k not in ('page', 'page_size', 'order_by', 'format', 'search')]
+        objects = [obj for obj in objects if matches(self.store, collection, obj, filters)]
+        for key, value in query:
+            if key == 'order_by':
+                for field in reversed(value.split(',')):
+                    reverse = field.startswith('-')
+                    objects.sort(key=lambda o: (o.get(field.lstrip('-')) is None, str(o.get(field.lstrip('-')))),
+                                 reverse=reverse)
+            elif key == 'search':
+                objects = [obj for obj in objects if value.lower() in json.dumps(obj).lower()]
+        params = dict(query)
+        try:
+            size = min(MAX_PAGE_SIZE, max(1, int(params.get('page_size', PAGE_SIZE))))
+            number = max(1, int(params.get('page', 1)))
+        except ValueError:
+            raise HTTPError(400, {'detail': 'Invalid page.'})
+        if (number - 1) * size > len(objects):
+            raise HTTPError(404, {'detail': 'Invalid page.'})
+
+        def link(n):
+            if n < 1 or (n - 1) * size >= len(objects):
+                return None
+            return '%s?%s' % (request['path'], urlencode([(k, v) for k, v in query if k != 'page'] + [('page', n)]))
+        chunk = objects[(number - 1) * size:number * size]
+        return 200, {'count': len(objects), 'next': link(number + 1), 'previous': link(number - 1),
+                     'results': [self.store.render(collection or plural(obj['type']), obj) for obj in chunk]}
+
+    def route(self, request):
+        method = request['method']
+        parts = [p for p in request['path'][len(API):].split('/') if p]
+        body = request['body']
+        store = self.store
+        if not parts:
+            return 200, dict((c, '%s%s/' % (API, c)) for c in sorted(set(list(store.collections) + list(LAUNCH))))
+        collection = parts[0]
+        if collection == 'ping':
+            return 200, {'ha': False, 'version': '3.6.0', 'active_node': 'standin', 'install_uuid': 'standin',
+                         'instances': [{'node': 'standin', 'heartbeat': timestamp(time.time()), 'capacity': 100,
+                                        'version': '3.6.0'}], 'instance_groups': [{'name': 'tower', 'capacity': 100,
+                                                                                   'instances': ['standin']}]}
+        if collection == 'config':
+            return 200, {'version': '3.6.0', 'ansible_version': '2.9', 'time_zone': 'UTC',
+                         'license_info': {'license_type': 'enterprise', 'valid_key': True, 'free_instances': 10000},
+                         'project_base_dir': '/var/lib/awx/projects', 'project_local_paths': []}
+        if collection == 'me':
+            return self.page(request, 'users', [store.get('users', 1)])
+        if collection == 'authtoken' and method == 'POST':
+            token = store.create('tokens', {'description': 'authtoken'})
+            return 200, {'token': token['token'], 'expires': timestamp(time.time() + 36000)}
+        if collection == 'settings':
+            if len(parts) == 1:
+                return self.page(request, 'settings', [{'id': i, 'slug': c, 'url': '%ssettings/%s/' % (API, c)}
+                                                       for i, c in enumerate(SETTING_CATEGORIES)])
+            if method in ('PATCH', 'PUT'):
+                store.update('settings', None, body)
+            elif method == 'DELETE':
+                store.settings = dict(SETTINGS)
+                return 204, None
+            return 200, dict(store.settings)
+        if collection == 'unified_jobs':
+            objects = [o for c in UNIFIED_JOBS for o in store.collections[c].values()]
+            return self.page(request, None, objects)
+
+        if len(parts) == 1:
+            if method == 'GET':
+                return self.page(request, collection, list(store.collections[collection].values()))
+            if method == 'POST':
+                return 201, store.render(collection, store.create(collection, body))
+            raise HTTPError(405, {'detail': 'Method "%s" not allowed.' % method})
+
+        obj = store.get(collection, parts[1])
+        if len(parts) == 2:
+            if method == 'GET':
+                return 200, store.render(collection, obj)
+            if method in ('PUT', 'PATCH'):
+                return 200, store.render(collection, store.update(collection, obj, body, replace=method == 'PUT'))
+            if method == 'DELETE':
+                if collection in UNIFIED_JOBS and store.job_status(obj) not in FINISHED:
+                    raise HTTPError(403, {'error': 'Cannot delete running job resource.'})
+                store.delete(collection, obj['id'])
+                return 204, None
+            raise HTTPError(405, {'detail': 'Method "%s" not allowed.' % method})
+
+        action = parts[2]
+        if collection in LAUNCH and action == LAUNCH[collection][1]:
+            if method == 'GET':
+                return 200, {'can_start_without_user_input': True, 'can_update': True, 'passwords_needed_to_start': [],
+                             'variables_needed_to_start': [], 'credential_needed_to_start': False,
+                             'inventory_needed_to_start': False, 'survey_enabled': False,
+                             'ask_inventory_on_launch': obj.get('ask_inventory', obj.get('ask_inventory_on_launch',
+                                                                                          False)),
+                             'ask_credential_on_launch': obj.get('ask_credential',
+                                                                 obj.get('ask_credential_on_launch', False)),
+                             'ask_variables_on_launch': obj.get('ask_extra_vars',
+                                                                obj.get('ask_variables_on_launch', False)),
+                             'defaults': {'extra_vars': obj.get('extra_vars', ''), 'inventory': {
+                                 'id': obj.get('inventory')}},
+                             'job_template_data': {'id': obj['id'], 'name': obj.get('name'),
+                                                   'description': obj.get('description', '')}}
+            jobs, job = store.launch(collection, obj, body)
+            out = store.render(jobs, job)
+            out.update({singular(jobs): job['id'], 'ignored_fields': {}})
+            if collection in ('projects', 'inventory_sources'):
+                out[singular(collection) + '_update'] = job['id']
+            return 201 if collection not in ('projects', 'inventory_sources') else 202, out
+        if collection in UNIFIED_JOBS:
+            if action == 'cancel':
+                if method == 'GET':
+                    return 200, {'can_cancel': store.job_status(obj) not in FINISHED}
+                store.cancel(obj)
+                return 202, None
+            if action == 'relaunch':
+                if method == 'GET':
+                    return 200, {'passwords_needed_to_start': [], 'retry_counts': {}}
+                template = LAUNCH_BY_JOBS.get(collection)
+                if template is None or obj.get(singular(template)) not in store.collections[template]:
+                    raise HTTPError(400, {'detail': 'Job Template to relaunch no longer exists.'})
+                jobs, job = store.launch(template, store.collections[template][obj[singular(template)]],
+                                         {'extra_vars': obj.get('extra_vars')})
+                return 201, store.render(jobs, job)
+            if action == 'stdout':
+                return 200, {'range': {'start': 0, 'end': 0, 'absolute_end': 0}, 'content': ''}
+            if action in ('job_events', 'events', 'workflow_nodes', 'job_host_summaries', 'activity_stream'):
+                return self.page(request, action, [])
+
+        target, members = store.related(collection, obj['id'], action)
+        if method == 'GET':
+            return self.page(request, target, members)
+        if method != 'POST':
+            raise HTTPError(405, {'detail': 'Method "%s" not allowed.' % method})
+        if 'id' in body:
+            store.get(target, body['id'])
+            if body.get('disassociate'):
+                store.disassociate(collection, obj['id'], action, int(body['id']))
+            else:
+                store.associate(collection, obj['id'], action, int(body['id']))
+            return 204, None
+        data = dict(body)
+        parent = SCOPES.get(target, singular(collection))
+        data.setdefault(parent, obj['id'] if plural(parent) == collection else obj.get(parent))
+        created = store.create(target, data)
+        store.associate(collection, obj['id'], action, created['id'])
+        return 201, store.render(target, created)
+
+    def respond(self, request):
+        path = request['path']
+        if path.startswith('/_standin/'):
+            if path == '/_standin/reset/' and request['method'] == 'POST':
+                self.reset_stats()
+                return 204, None
+            if path == '/_standin/stats/':
+                return 200, self.stats()
+            raise not_found()
+        if path == '/api/':
+            return 200, {'description': 'AWX REST API', 'current_version': API,
+                         'available_versions': {'v2': API}, 'oauth2': '/api/o/'}
+        if path == '/api/o/token/':
+            token = self.store.create('tokens', {'description': 'oauth2'})
+            return 201, {'access_token': token['token'], 'token_type': 'Bearer', 'expires_in': 31536000,
+                         'refresh_token': None, 'scope': 'write'}
+        if not path.startswith(API):
+            raise not_found()
+        return self.route(request)
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        served = 0
+        try:
+            while True:
+                line = await asyncio.wait_for(reader.readline(), self.args.keepalive)
+                if not line:
+                    break
+                try:
+                    method, target, version = line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = header.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length') or 0)
+                raw = await reader.readexactly(length) if length else b''
+                start = time.time()
+                split = urlsplit(target)
+                path = split.path if split.path.endswith('/') else split.path + '/'
+                endpoint = '%s %s' % (method, '/'.join('{id}' if p.isdigit() else p for p in path.split('/')))
+                status, body = self.dispatch(method, path, parse_qsl(split.query, keep_blank_values=True), raw)
+                counted = not path.startswith('/_standin/')
+                if counted:
+                    delay = self.delay(endpoint)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                keep_alive = headers.get('connection', '').lower() != 'close' and (
+                    version != 'HTTP/1.0' or headers.get('connection', '').lower() == 'keep-alive')
+                payload = json.dumps(body).encode('utf-8') if body is not None else b''
+                head = ['HTTP/1.1 %d %s' % (status, REASONS.get(status, 'OK')),
+                        'Content-Length: %d' % len(payload),
+                        'Connection: %s' % ('keep-alive' if keep_alive else 'close')]
+                if body is not None:
+                    head.append('Content-Type: application/json')
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + payload)
+                await writer.drain()
+                served += 1
+                if counted:
+                    self.latencies[endpoint].append(time.time() - start)
+                    self.statuses[endpoint][status] += 1
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.per_connection.append(served)
+            writer.close()
+
+    def dispatch(self, method, path, query, raw):
+        try:
+            try:
+                body = json.loads(raw.decode('utf-8')) if raw.strip() else {}
+            except ValueError as e:
+                raise HTTPError(400, {'detail': 'JSON parse error - %s' % e})
+            if method in ('POST', 'PUT', 'PATCH') and not isinstance(body, dict):
+                raise HTTPError(400, {'detail': 'Expected a dictionary of items.'})
+            return self.respond({'method': method, 'path': path, 'query': query, 'body': body})
+        except HTTPError as e:
+            return e.status, e.body
+        except (KeyError, TypeError, ValueError) as e:
+            # requests this stand-in does not understand, rather than a dropped connection
+            sys.stderr.write('%s %s failed: %r\n' % (method, path, e))
+            return 500, {'detail': 'stand-in could not handle the request: %r' % e}
+
+    def report(self, out):
+        stats = self.stats()
+        out.write('{:<64} {:>8} {:>10} {:>10} {:>10}\n'.format('endpoint', 'count', 'mean ms', 'p95 ms', 'max ms'))
+        for endpoint, values in sorted(stats['endpoints'].items(), key=lambda e: -e[1]['count']):
+            out.write('{:<64} {:>8d} {:>10.2f} {:>10.2f} {:>10.2f}\n'.format(
+                endpoint, values['count'], values['mean'] * 1000, values['p95'] * 1000, values['max'] * 1000))
+        out.write('{} requests over {} connections, {:.1f} per connection\n'.format(
+            stats['requests'], stats['connections'], stats['requests_per_connection']))
+        if self.args.stats_file:
+            with open(self.args.stats_file, 'w') as f:
+                json.dump(stats, f, indent=2, sort_keys=True)
+
+
+async def serve(standin, args):
+    context = None
+    if args.certfile:
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(args.certfile, args.keyfile)
+    server = await asyncio.start_server(standin.handle, args.host, args.port, ssl=context)
+    stop = asyncio.Event()
+    loop = asyncio.get_event_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    sys.stderr.write('tower stand-in listening on %s://%s:%d\n' % ('https' if context else 'http', args.host,
+                                                                   args.port))
+    async with server:
+        await stop.wait()
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8013, help='Port to listen on (default: 8013)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds every response is delayed by')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Up to this many seconds are added at random')
+    parser.add_argument('--endpoint-latency', action='append', default=[], metavar='"METHOD PATH=SECONDS"',
+                        help='Latency of one endpoint, e.g. "POST /api/v2/job_templates/{id}/launch/=0.5"')
+    parser.add_argument('--job-pending', type=float, default=0.5, help='Seconds a launched job stays pending')
+    parser.add_argument('--job-duration', type=float, default=2.0, help='Seconds a launched job then runs for')
+    parser.add_argument('--keepalive', type=float, default=75.0, help='Seconds an idle connection is kept open')
+    parser.add_argument('--stats-file', metavar='PATH', help='Write the request statistics here when stopping')
+    parser.add_argument('--certfile', help='Serve HTTPS with this certificate')
+    parser.add_argument('--keyfile', help='Private key of --certfile')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    standin = Standin(args)
+    try:
+        asyncio.run(serve(standin, args))
+    finally:
+        standin.report(sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
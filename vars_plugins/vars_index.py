@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    vars: vars_index
+    version_added: "2.9"
+    short_description: host_group_vars served from a precompiled, memory mapped index
+    requirements:
+        - enabled in place of host_group_vars (vars_plugins_enabled = vars_index, or ANSIBLE_VARS_ENABLED=vars_index)
+    description:
+        - Loads the same C(host_vars/) and C(group_vars/) files as host_group_vars, with the same precedence,
+          but keeps their parsed contents in one binary index per inventory or playbook directory.
+        - The index records the mtime and size of every file. Files that did not change are read straight out
+          of the memory mapped index instead of being parsed as YAML again, changed and new files are parsed
+          and added, and files that disappeared are dropped when the index is rewritten at exit.
+        - Files with vaulted or C(!unsafe) values, and files whose data does not survive a JSON round trip (dates,
+          non string keys), are never stored and are always loaded from disk, so their values keep their types.
+        - When the index directory cannot be created the files are loaded from disk like host_group_vars does.
+    options:
+      index_dir:
+        description: Directory the index files are kept in, one per inventory or playbook directory.
+        default: ~/.ansible/vars_index
+        env:
+          - name: ANSIBLE_VARS_INDEX_DIR
+'''
+
+import atexit
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+from ansible.errors import AnsibleParserError
+from ansible.inventory.group import Group
+from ansible.inventory.host import Host
+from ansible.module_utils._text import to_bytes, to_native, to_text
+from ansible.module_utils.common._collections_compat import Mapping, Sequence
+from ansible.module_utils.six import string_types
+from ansible.parsing.yaml.objects import AnsibleVaultEncryptedUnicode
+from ansible.plugins.vars import BaseVarsPlugin
+from ansible.utils.unsafe_proxy import AnsibleUnsafe
+from ansible.utils.vars import combine_vars
+
+# <magic><table offset><table length>, then the JSON encoded file contents, then the JSON table
+# mapping every indexed file to [mtime_ns, size, offset, length], offset -1 marks files to load from disk
+MAGIC = b'VARSIDX1'
+HEADER = struct.Struct('<8sQQ')
+VAULT_MARKER = b'$ANSIBLE_VAULT'
+
+FOUND = {}
+INDEXES = {}
+
+
+def stamp(st):
+    return [getattr(st, 'st_mtime_ns', None) or int(st.st_mtime * 1000000000), st.st_size]
+
+
+def tagged(data):
+    ''' whether data holds !unsafe or !vault values, which compare equal to plain strings but must not turn into them '''
+    if isinstance(data, (AnsibleUnsafe, AnsibleVaultEncryptedUnicode)):
+        return True
+    if isinstance(data, Mapping):
+        return any(tagged(key) or tagged(value) for key, value in data.items())
+    if isinstance(data, Sequence) and not isinstance(data, string_types):
+        return any(tagged(value) for value in data)
+    return False
+
+
+class VarsIndex(object):
+    ''' the index of one directory, read through mmap, rewritten at exit when anything changed '''
+
+    def __init__(self, path):
+        self.path = path
+        self.pid = os.getpid()
+        self.table = {}
+        self.mapped = None
+        self.added = {}
+        self.dirty = False
+        self.open()
+
+    def open(self):
+        try:
+            with open(self.path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (IOError, OSError, ValueError):
+            # missing or empty index
+            return
+        if len(mapped) < HEADER.size:
+            mapped.close()
+            return
+        magic, offset, length = HEADER.unpack(mapped[:HEADER.size])
+        try:
+            if magic != MAGIC:
+                raise ValueError('not a vars index')
+            self.table = json.loads(to_text(mapped[offset:offset + length]))
+        except ValueError:
+            mapped.close()
+            self.table = {}
+            self.dirty = True
+            return
+        self.mapped = mapped
+
+    def payload(self, record):
+        if record[2] in self.added:
+            return self.added[record[2]]
+        return self.mapped[record[2]:record[2] + record[3]]
+
+    def load(self, loader, filename):
+        ''' parsed contents of one vars file, from the index when the file did not change since it was stored '''
+        current = stamp(os.stat(filename))
+        record = self.table.get(filename)
+        if record is not None and record[:2] == current:
+            if record[2] < 0:
+                return loader.load_from_file(filename, cache=True, unsafe=True)
+            return json.loads(to_text(self.payload(record)))
+
+        with open(filename, 'rb') as f:
+            vaulted = VAULT_MARKER in f.read()
+        data = loader.load_from_file(filename, cache=True, unsafe=True)
+        record = current + [-1, 0]
+        if not vaulted and not tagged(data):
+            try:
+                encoded = json.dumps(data, separators=(',', ':'), sort_keys=True)
+                if json.loads(encoded) == data:
+                    # new payloads are keyed by a negative placeholder until the index is written
+                    key = -2 - len(self.added)
+                    self.added[key] = to_bytes(encoded)
+                    record = current + [key, len(self.added[key])]
+            except (TypeError, ValueError):
+                pass
+        self.table[filename] = record
+        self.dirty = True
+        return data
+
+    def write(self):
+        if not self.dirty or os.getpid() != self.pid:
+            return
+        table = {}
+        tmp = '%s.%d.tmp' % (self.path, self.pid)
+        try:
+            with open(tmp, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, 0, 0))
+                offset = HEADER.size
+                for filename, record in sorted(self.table.items()):
+                    if not os.path.exists(filename):
+                        continue
+                    if record[2] < 0 and record[2] not in self.added:
+                        table[filename] = record
+                        continue
+                    payload = self.payload(record)
+                    f.write(payload)
+                    table[filename] = record[:2] + [offset, len(payload)]
+                    offset += len(payload)
+                encoded = to_bytes(json.dumps(table, separators=(',', ':')))
+                f.write(encoded)
+                f.seek(0)
+                f.write(HEADER.pack(MAGIC, offset, len(encoded)))
+            os.rename(tmp, self.path)
+        except (IOError, OSError):
+            # the index is only a cache, the next run parses the files again
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        self.dirty = False
+
+
+def write_indexes():
+    for index in INDEXES.values():
+        if index is not None:
+            index.write()
+
+
+atexit.register(write_indexes)
+
+
+class VarsModule(BaseVarsPlugin):
+
+    REQUIRES_WHITELIST = True
+    REQUIRES_ENABLED = True
+
+    def index_dir(self):
+        try:
+            index_dir = self.get_option('index_dir')
+        except (AttributeError, KeyError):
+            # options not loaded for this plugin, e.g. older releases
+            index_dir = os.environ.get('ANSIBLE_VARS_INDEX_DIR', '~/.ansible/vars_index')
+        return os.path.expanduser(index_dir)
+
+    def index(self):
+        ''' the index of the current basedir, None when it cannot be kept '''
+        basedir = os.path.realpath(self._basedir)
+        if basedir not in INDEXES:
+            index_dir = self.index_dir()
+            try:
+                if not os.path.isdir(index_dir):
+                    os.makedirs(index_dir)
+            except OSError as e:
+                self._display.warning("vars_index: loading vars files without an index, cannot use %s: %s"
+                                      % (index_dir, to_native(e)))
+                INDEXES[basedir] = None
+            else:
+                name = hashlib.sha1(to_bytes(basedir)).hexdigest() + '.idx'
+                INDEXES[basedir] = VarsIndex(os.path.join(index_dir, name))
+        return INDEXES[basedir]
+
+    def get_vars(self, loader, path, entities, cache=True):
+        ''' same lookup as host_group_vars, with the file contents coming from the index '''
+        if not isinstance(entities, list):
+            entities = [entities]
+
+        super(VarsModule, self).get_vars(loader, path, entities)
+
+        data = {}
+        for entity in entities:
+            if isinstance(entity, Host):
+                subdir = 'host_vars'
+            elif isinstance(entity, Group):
+                subdir = 'group_vars'
+            else:
+                raise AnsibleParserError("Supplied entity must be Host or Group, got %s instead" % (type(entity)))
+
+            # avoid 'chroot' type inventory hostnames /path/to/chroot
+            if entity.name.startswith(os.path.sep):
+                continue
+            try:
+                found_files = []
+                opath = to_text(os.path.realpath(to_bytes(os.path.join(self._basedir, subdir))))
+                key = '%s.%s' % (entity.name, opath)
+                if cache and key in FOUND:
+                    found_files = FOUND[key]
+                elif os.path.exists(opath):
+                    if os.path.isdir(opath):
+                        found_files = loader.find_vars_files(opath, entity.name)
+                        FOUND[key] = found_files
+                    else:
+                        self._display.warning("Found %s that is not a directory, skipping: %s" % (subdir, opath))
+            except Exception as e:
+                raise AnsibleParserError(to_native(e))
+            if not found_files:
+                continue
+
+            index = self.index()
+            try:
+                for found in found_files:
+                    if index is None:
+                        new_data = loader.load_from_file(found, cache=True, unsafe=True)
+                    else:
+                        new_data = index.load(loader, to_text(found))
+                    if new_data:  # ignore empty files
+                        data = combine_vars(data, new_data)
+            except Exception as e:
+                raise AnsibleParserError(to_native(e))
+        return data
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    vars: vault_cache
+    version_added: "2.9"
+    short_description: Keeps decrypted vault plaintext in memory for the run
+    requirements:
+        - opt in with C(ANSIBLE_VAULT_CACHE=1), otherwise loading the plugin changes nothing
+    description:
+        - Vaulted values are decrypted again every time they are templated and every decryption
+          runs the vault key derivation, so the cost grows with the number of hosts, tasks and references.
+        - Loading this plugin wraps the vault decryption in an in-process LRU cache keyed by a SHA-256
+          hash of the ciphertext. Every entry remembers the vault ID and secret that decrypted it and is
+          only handed to a VaultLib holding that same secret. Plaintext only ever lives in memory and the
+          cache is emptied when the process exits.
+        - Workers are forked per task, so anything they decrypt is lost when they exit. To make the cache
+          useful to them, inline C(!vault) values in YAML loaded on the controller after the plugin (host_vars,
+          group_vars, vars_files, role vars) are decrypted as soon as they are loaded, every worker forked
+          afterwards inherits the plaintext.
+        - Vars plugins are loaded after the playbook is parsed, so C(!vault) values written in the playbook
+          itself are not preloaded, they are only cached within each process that decrypts them.
+        - It does not add any variables. Use the C(vault_cache_stats) filter to see hits and misses.
+    notes:
+        - Without C(ANSIBLE_VAULT_CACHE=1) VaultLib and the YAML constructor are left untouched, so other vault
+          tests measure stock behaviour.
+        - C(ANSIBLE_VAULT_CACHE_SIZE) bounds the number of cached plaintexts, 1024 by default.
+        - C(ANSIBLE_VAULT_CACHE_PRELOAD=0) turns off decrypting on load, leaving only what each process decrypts itself.
+'''
+
+import atexit
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from ansible.module_utils._text import to_bytes
+from ansible.parsing.vault import VaultLib
+from ansible.parsing.yaml.constructor import AnsibleConstructor
+from ansible.plugins.vars import BaseVarsPlugin
+from ansible.utils.display import Display
+
+display = Display()
+
+
+class PlaintextCache(object):
+    ''' bounded LRU of decrypt results, keyed by the ciphertext sha256 '''
+
+    def __init__(self, max_entries):
+        self.max_entries = max(1, max_entries)
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(b_vaulttext):
+        return hashlib.sha256(b_vaulttext.strip()).hexdigest()
+
+    def get(self, key, allowed):
+        ''' the cached result if allowed(result) accepts it, None otherwise '''
+        with self.lock:
+            value = self.entries.pop(key, None)
+            if value is None or not allowed(value):
+                if value is not None:
+                    self.entries[key] = value
+                self.misses += 1
+                return None
+            self.entries[key] = value
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = value
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {'enabled': True, 'size': len(self.entries), 'max_size': self.max_entries,
+                    'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+
+def secret_bytes(secret):
+    return getattr(secret, 'bytes', None)
+
+
+def holds_secret(secrets, vault_id, secret):
+    ''' whether the (vault id, secret) pairs of a VaultLib include the one that decrypted a cached value '''
+    for held_id, held in secrets or ():
+        if held_id != vault_id:
+            continue
+        if held is secret or (secret_bytes(secret) is not None and secret_bytes(held) == secret_bytes(secret)):
+            return True
+    return False
+
+
+def install(max_entries, preload):
+    ''' wraps VaultLib and the YAML constructor once per process '''
+    if getattr(VaultLib, '_plaintext_cache', None) is not None:
+        return VaultLib._plaintext_cache
+
+    cache = PlaintextCache(max_entries)
+    decrypt_and_get_vault_id = VaultLib.decrypt_and_get_vault_id
+    construct_vault_encrypted_unicode = AnsibleConstructor.construct_vault_encrypted_unicode
+
+    def cached_decrypt_and_get_vault_id(self, vaulttext, filename=None, obj=None):
+        key = cache.key(to_bytes(vaulttext, errors='surrogate_or_strict'))
+        # (plaintext, vault id used, secret used), only served to a VaultLib that could decrypt it itself
+        result = cache.get(key, lambda result: holds_secret(self.secrets, result[1], result[2]))
+        if result is None:
+            # failures raise and are not cached, a later call with other secrets may still succeed
+            result = decrypt_and_get_vault_id(self, vaulttext, filename=filename, obj=obj)
+            cache.put(key, result)
+        return result
+
+    def preloading_construct_vault_encrypted_unicode(self, node):
+        ret = construct_vault_encrypted_unicode(self, node)
+        if ret.vault is not None:
+            try:
+                ret.vault.decrypt(ret._ciphertext, obj=ret)
+            except Exception as e:
+                # missing or wrong secrets fail later, where the value is actually used
+                display.vvvv('vault_cache: not preloading %s: %s' % (getattr(ret, 'ansible_pos', ('?',))[0], e))
+        return ret
+
+    VaultLib.decrypt_and_get_vault_id = cached_decrypt_and_get_vault_id
+    if preload:
+        AnsibleConstructor.construct_vault_encrypted_unicode = preloading_construct_vault_encrypted_unicode
+    VaultLib._plaintext_cache = cache
+    atexit.register(cache.clear)
+    return cache
+
+
+if os.environ.get('ANSIBLE_VAULT_CACHE', '0').lower() in ('1', 'true', 'yes', 'on'):
+    install(int(os.environ.get('ANSIBLE_VAULT_CACHE_SIZE', 1024)),
+            os.environ.get('ANSIBLE_VAULT_CACHE_PRELOAD', '1').lower() not in ('0', 'false', 'no', 'off'))
+
+
+class VarsModule(BaseVarsPlugin):
+
+    # importing the plugin installs the cache when ANSIBLE_VAULT_CACHE is set, enabling it adds nothing
+    REQUIRES_WHITELIST = False
+    REQUIRES_ENABLED = False
+
+    def get_vars(self, loader, path, entities, cache=True):
+        super(VarsModule, self).get_vars(loader, path, entities)
+        return {}